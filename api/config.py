@@ -18,4 +18,90 @@ CORS_ORIGINS = [o.strip() for o in CORS_ORIGINS_RAW.split(",") if o.strip()]
 SECRET_KEY = os.getenv("SECRET_KEY", "")
 TTN_WEBHOOK_SECRET = os.getenv("TTN_WEBHOOK_SECRET", "")
 
+# Admins aprobados: la migración 0005 conserva su rol (correos separados por coma)
+ADMIN_CORREOS_RAW = os.getenv("ADMIN_CORREOS", "")
+ADMIN_CORREOS = [c.strip().lower() for c in ADMIN_CORREOS_RAW.split(",") if c.strip()]
+
 IS_PROD = APP_ENV == "prod"
+
+# Resumen estadístico (/datos/resumen): caché en memoria para rangos cerrados
+RESUMEN_CACHE_MAX = int(os.getenv("RESUMEN_CACHE_MAX", "256"))
+RESUMEN_CACHE_TTL_S = int(os.getenv("RESUMEN_CACHE_TTL_S", "3600"))
+# Un rango se considera cerrado si `fin` es anterior a ahora - margen (uplinks tardíos)
+RESUMEN_MARGEN_CIERRE_S = int(os.getenv("RESUMEN_MARGEN_CIERRE_S", "900"))
+
+# ---- Despliegue multi-worker / pool de conexiones ----
+# Número de workers de gunicorn por réplica
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "2")))
+# Presupuesto total de conexiones a Postgres por réplica; se reparte entre workers
+DB_MAX_CONEXIONES = int(os.getenv("DB_MAX_CONEXIONES", "20"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(max(1, DB_MAX_CONEXIONES // WEB_CONCURRENCY))))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "0"))
+DB_POOL_TIMEOUT_S = int(os.getenv("DB_POOL_TIMEOUT_S", "30"))
+DB_POOL_RECYCLE_S = int(os.getenv("DB_POOL_RECYCLE_S", "1800"))
+DB_CONNECT_TIMEOUT_S = int(os.getenv("DB_CONNECT_TIMEOUT_S", "5"))
+
+# Arranque: el calentamiento reintenta hasta lograrlo; pasado ARRANQUE_ESPERA_DB_S
+# cada reintento fallido se registra como warning
+ARRANQUE_ESPERA_DB_S = int(os.getenv("ARRANQUE_ESPERA_DB_S", "60"))
+ARRANQUE_REINTENTO_MAX_S = float(os.getenv("ARRANQUE_REINTENTO_MAX_S", "30"))
+
+# Cachés en memoria por worker
+AUTH_CACHE_MAX = int(os.getenv("AUTH_CACHE_MAX", "10000"))
+AUTH_CACHE_TTL_S = int(os.getenv("AUTH_CACHE_TTL_S", "60"))
+AUTH_CACHE_INVALIDOS_TTL_S = int(os.getenv("AUTH_CACHE_INVALIDOS_TTL_S", "30"))
+DISPOSITIVOS_CACHE_MAX = int(os.getenv("DISPOSITIVOS_CACHE_MAX", "50000"))
+DISPOSITIVOS_CACHE_TTL_S = int(os.getenv("DISPOSITIVOS_CACHE_TTL_S", "300"))
+
+# Índice de estado por dispositivo (/dispositivos/estado)
+ESTADO_EWMA_ALFA = float(os.getenv("ESTADO_EWMA_ALFA", "0.2"))
+# Un intervalo mayor que FACTOR_HUECO * intervalo esperado cuenta como hueco
+ESTADO_FACTOR_HUECO = float(os.getenv("ESTADO_FACTOR_HUECO", "2.5"))
+# Silencioso: sin uplinks durante FACTOR_SILENCIO * intervalo esperado
+ESTADO_FACTOR_SILENCIO = float(os.getenv("ESTADO_FACTOR_SILENCIO", "3.0"))
+ESTADO_SILENCIO_DEFECTO_S = int(os.getenv("ESTADO_SILENCIO_DEFECTO_S", "3600"))
+# Degradado: tasa de pérdida reciente por encima del umbral
+ESTADO_UMBRAL_PERDIDA = float(os.getenv("ESTADO_UMBRAL_PERDIDA", "0.2"))
+ESTADO_HUECOS_MAX = int(os.getenv("ESTADO_HUECOS_MAX", "32"))
+# Tras N huecos seguidos se asume cambio de periodo y se reaprende el intervalo
+ESTADO_HUECOS_REAPRENDER = int(os.getenv("ESTADO_HUECOS_REAPRENDER", "3"))
+# Mientras el intervalo tenga menos deltas normales no se estiman pérdidas por tiempo
+ESTADO_MUESTRAS_APRENDER = int(os.getenv("ESTADO_MUESTRAS_APRENDER", "3"))
+
+# ---- Límites de tasa y admisión (por worker) ----
+LIMITES_ACTIVOS = _get_bool("LIMITES_ACTIVOS", "true")
+# Rutas de consulta, por usuario autenticado: requests/segundo sostenidos y ráfaga
+LIMITE_TOKEN_RPS = float(os.getenv("LIMITE_TOKEN_RPS", "5"))
+LIMITE_TOKEN_RAFAGA = int(os.getenv("LIMITE_TOKEN_RAFAGA", "20"))
+# Tokens fuera de la caché de autenticados (nuevos, caducados o falsos), por dirección del cliente
+LIMITE_DESCONOCIDO_RPS = float(os.getenv("LIMITE_DESCONOCIDO_RPS", "20"))
+LIMITE_DESCONOCIDO_RAFAGA = int(os.getenv("LIMITE_DESCONOCIDO_RAFAGA", "40"))
+# /ttn/webhook, por EUI
+LIMITE_EUI_RPS = float(os.getenv("LIMITE_EUI_RPS", "1"))
+LIMITE_EUI_RAFAGA = int(os.getenv("LIMITE_EUI_RAFAGA", "10"))
+# Máximo de claves (tokens/EUIs) con cubeta en memoria
+LIMITE_MAX_CLAVES = int(os.getenv("LIMITE_MAX_CLAVES", "10000"))
+# Endpoints caros (series con `limite` grande, resumen completo) en paralelo
+CONCURRENCIA_CARA_MAX = int(os.getenv("CONCURRENCIA_CARA_MAX", "4"))
+SERIE_LIMITE_CARO = int(os.getenv("SERIE_LIMITE_CARO", "5000"))
+
+# ---- Perfilado de consultas (opt-in) ----
+PERFIL_ACTIVO = _get_bool("PERFIL_ACTIVO", "false")
+# Requests más lentos que esto se registran con su SQL, parámetros y tiempos
+PERFIL_UMBRAL_MS = float(os.getenv("PERFIL_UMBRAL_MS", "500"))
+# Tamaño del ranking de requests lentos (por worker)
+PERFIL_TOP_N = int(os.getenv("PERFIL_TOP_N", "20"))
+PERFIL_MAX_CONSULTAS = int(os.getenv("PERFIL_MAX_CONSULTAS", "50"))
+# EXPLAIN (ANALYZE, BUFFERS) de consultas lentas en routers/datos.py, solo para admins
+PERFIL_EXPLAIN = _get_bool("PERFIL_EXPLAIN", "true")
+
+# ---- Ingesta: directa o por cola con workers particionados ----
+# directo: el webhook persiste el uplink. cola: el webhook solo encola en
+# `cola_ingesta` y `python -m services.ingesta` lo procesa.
+INGESTA_MODO = os.getenv("INGESTA_MODO", "directo").strip().lower()
+INGESTA_WORKERS = max(1, int(os.getenv("INGESTA_WORKERS", "4")))
+INGESTA_LOTE = int(os.getenv("INGESTA_LOTE", "200"))
+INGESTA_ESPERA_S = float(os.getenv("INGESTA_ESPERA_S", "0.2"))
+INGESTA_MAX_INTENTOS = int(os.getenv("INGESTA_MAX_INTENTOS", "5"))
+# Qué routers sirve este proceso: todo | ingesta (solo /ttn) | consulta (sin /ttn)
+APP_ROL = os.getenv("APP_ROL", "todo").strip().lower()
@@ -0,0 +1,108 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+from config import (
+    ARRANQUE_ESPERA_DB_S,
+    ARRANQUE_REINTENTO_MAX_S,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    INGESTA_MODO,
+)
+from database import engine, SessionLocal
+from core.deps import precargar_usuarios
+from services import precargar_dispositivos
+
+logger = logging.getLogger("arranque")
+
+
+def calentar_pool() -> None:
+    # Abre DB_POOL_SIZE conexiones a la vez y las devuelve al pool
+    conexiones = []
+    try:
+        for _ in range(DB_POOL_SIZE):
+            conexiones.append(engine.connect())
+    finally:
+        for conn in conexiones:
+            conn.close()
+
+
+def calentar(estado: Any, detener: Optional[threading.Event] = None) -> None:
+    # Se ejecuta en un hilo desde el lifespan: el worker ya acepta /health
+    # mientras tanto, y /ready responde 503 hasta que termine. Si Postgres no
+    # está o algo falla, reintenta con backoff hasta lograrlo (o hasta el apagado).
+    detener = detener or threading.Event()
+    inicio = time.monotonic()
+    pausa = 0.5
+    while not detener.is_set():
+        try:
+            calentar_pool()
+            with SessionLocal() as db:
+                n_usuarios = precargar_usuarios(db)
+                n_dispositivos = precargar_dispositivos(db)
+        except Exception as e:
+            transcurrido = time.monotonic() - inicio
+            if transcurrido >= ARRANQUE_ESPERA_DB_S:
+                logger.warning(f"[ARRANQUE] sin calentar tras {transcurrido:.0f}s, reintentando: {e}")
+            detener.wait(pausa)
+            pausa = min(pausa * 2, ARRANQUE_REINTENTO_MAX_S)
+            continue
+
+        estado.listo = True
+        logger.info(
+            f"[ARRANQUE] listo en {time.monotonic() - inicio:.2f}s "
+            f"pool={DB_POOL_SIZE} usuarios={n_usuarios} dispositivos={n_dispositivos}"
+        )
+        return
+
+
+def verificar_db() -> Dict[str, Any]:
+    inicio = time.monotonic()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return {"ok": False, "error": str(e)[:200]}
+    return {"ok": True, "latencia_ms": round((time.monotonic() - inicio) * 1000, 1)}
+
+
+def verificar_pool() -> Dict[str, Any]:
+    # La "cola" de este proceso: requests esperando conexión del pool
+    pool = engine.pool
+    en_uso = pool.checkedout()
+    capacidad = DB_POOL_SIZE + DB_MAX_OVERFLOW
+    return {
+        "ok": en_uso < capacidad,
+        "tamano": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "en_uso": en_uso,
+    }
+
+
+def verificar_cola() -> Dict[str, Any]:
+    # Backlog de cola_ingesta (modo cola). Informativo: un backlog no deja al
+    # API sin servir, pero sí indica workers caídos o insuficientes.
+    if INGESTA_MODO != "cola":
+        return {"ok": True, "modo": INGESTA_MODO}
+    try:
+        with engine.connect() as conn:
+            fila = conn.execute(text(
+                "SELECT recibido_en FROM cola_ingesta WHERE NOT fallido ORDER BY id LIMIT 1"
+            )).first()
+            fallidos = conn.execute(text(
+                "SELECT EXISTS (SELECT 1 FROM cola_ingesta WHERE fallido)"
+            )).scalar()
+            antiguedad_s = conn.execute(
+                text("SELECT EXTRACT(EPOCH FROM (now() - :t))"), {"t": fila[0]}
+            ).scalar() if fila else 0.0
+    except Exception as e:
+        return {"ok": False, "modo": INGESTA_MODO, "error": str(e)[:200]}
+    return {
+        "ok": True,
+        "modo": INGESTA_MODO,
+        "pendiente_mas_antiguo_s": round(float(antiguedad_s or 0.0), 1),
+        "hay_fallidos": bool(fallidos),
+    }
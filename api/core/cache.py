@@ -0,0 +1,48 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class CacheTTL:
+    # LRU acotado con expiración por entrada. Seguro entre hilos (FastAPI ejecuta
+    # los endpoints síncronos en un threadpool).
+
+    def __init__(self, max_items: int, ttl_s: float):
+        self.max_items = max(1, int(max_items))
+        self.ttl_s = float(ttl_s)
+        self._items: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave: Hashable) -> Optional[Any]:
+        ahora = time.monotonic()
+        with self._lock:
+            item = self._items.get(clave)
+            if item is None:
+                return None
+            expira, valor = item
+            if expira < ahora:
+                del self._items[clave]
+                return None
+            self._items.move_to_end(clave)
+            return valor
+
+    def set(self, clave: Hashable, valor: Any) -> None:
+        expira = time.monotonic() + self.ttl_s
+        with self._lock:
+            self._items[clave] = (expira, valor)
+            self._items.move_to_end(clave)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def delete(self, clave: Hashable) -> None:
+        with self._lock:
+            self._items.pop(clave, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
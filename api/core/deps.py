@@ -1,13 +1,79 @@
+from typing import NamedTuple, Optional
+
 from fastapi import Header, HTTPException, Depends
 from sqlalchemy.orm import Session
 from database import get_db
+from config import AUTH_CACHE_MAX, AUTH_CACHE_TTL_S, AUTH_CACHE_INVALIDOS_TTL_S
+from core.cache import CacheTTL
 from models import Usuario
 
+
+class UsuarioActual(NamedTuple):
+    # Vista inmutable del usuario autenticado: se puede cachear entre requests
+    # sin arrastrar instancias ORM ligadas a otra sesión.
+    id: int
+    nombre: str
+    correo: str
+    rol: str
+
+
+_cache_usuarios = CacheTTL(AUTH_CACHE_MAX, AUTH_CACHE_TTL_S)
+# Tokens inválidos recientes: un flood de tokens falsos repetidos no vuelve a la DB
+_cache_tokens_invalidos = CacheTTL(AUTH_CACHE_MAX, AUTH_CACHE_INVALIDOS_TTL_S)
+
+
+def _a_usuario_actual(usuario: Usuario) -> UsuarioActual:
+    return UsuarioActual(
+        id=usuario.id,
+        nombre=usuario.nombre,
+        correo=usuario.correo,
+        rol=usuario.rol,
+    )
+
+
+def token_en_cache(token: str) -> Optional[bool]:
+    # True: autenticado recientemente; False: inválido reciente; None: desconocido
+    if _cache_usuarios.get(token) is not None:
+        return True
+    if _cache_tokens_invalidos.get(token) is not None:
+        return False
+    return None
+
+
+def buscar_usuario_por_token(db: Session, token: str) -> Optional[UsuarioActual]:
+    actual = _cache_usuarios.get(token)
+    if actual is not None:
+        return actual
+    if _cache_tokens_invalidos.get(token) is not None:
+        return None
+    usuario = db.query(Usuario).filter(Usuario.token == token).first()
+    if not usuario:
+        _cache_tokens_invalidos.set(token, True)
+        return None
+    actual = _a_usuario_actual(usuario)
+    _cache_usuarios.set(token, actual)
+    return actual
+
+
+def precargar_usuarios(db: Session) -> int:
+    # Calentamiento: carga los tokens hasta llenar la caché
+    usuarios = db.query(Usuario).order_by(Usuario.id.desc()).limit(AUTH_CACHE_MAX).all()
+    for usuario in usuarios:
+        _cache_usuarios.set(usuario.token, _a_usuario_actual(usuario))
+    return len(usuarios)
+
+
 def get_current_user(
     db: Session = Depends(get_db),
     x_api_token: str = Header(..., alias="X-API-Token"),
-) -> Usuario:
-    usuario = db.query(Usuario).filter(Usuario.token == x_api_token).first()
+) -> UsuarioActual:
+    usuario = buscar_usuario_por_token(db, x_api_token)
     if not usuario:
         raise HTTPException(status_code=401, detail="Token inválido")
     return usuario
+
+
+def get_admin_user(usuario: UsuarioActual = Depends(get_current_user)) -> UsuarioActual:
+    if usuario.rol != "admin":
+        raise HTTPException(status_code=403, detail="Requiere rol admin")
+    return usuario
@@ -0,0 +1,151 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Hashable, Iterator, Tuple
+
+from fastapi import Depends, Header, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from config import (
+    LIMITES_ACTIVOS,
+    LIMITE_TOKEN_RPS,
+    LIMITE_TOKEN_RAFAGA,
+    LIMITE_DESCONOCIDO_RPS,
+    LIMITE_DESCONOCIDO_RAFAGA,
+    LIMITE_EUI_RPS,
+    LIMITE_EUI_RAFAGA,
+    LIMITE_MAX_CLAVES,
+    CONCURRENCIA_CARA_MAX,
+)
+from core.deps import buscar_usuario_por_token, token_en_cache
+from database import get_db
+
+
+class LimitadorTasa:
+    # Token bucket por clave con memoria acotada. Las cubetas se guardan en
+    # orden LRU; una cubeta que ya se habría rellenado por completo equivale
+    # a no tenerla, así que se descarta desde el frente sin perder información.
+
+    def __init__(self, tasa: float, rafaga: int, max_claves: int):
+        self.tasa = float(tasa)
+        self.rafaga = float(rafaga)
+        self.max_claves = max(1, int(max_claves))
+        self._llenado_s = self.rafaga / self.tasa if self.tasa > 0 else math.inf
+        # clave -> [fichas, último acceso]
+        self._cubetas: "OrderedDict[Hashable, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def permitir(self, clave: Hashable) -> Tuple[bool, float]:
+        # -> (permitido, segundos hasta la próxima ficha)
+        ahora = time.monotonic()
+        with self._lock:
+            cubeta = self._cubetas.get(clave)
+            if cubeta is None:
+                self._liberar(ahora)
+                cubeta = [self.rafaga, ahora]
+                self._cubetas[clave] = cubeta
+            else:
+                cubeta[0] = min(self.rafaga, cubeta[0] + (ahora - cubeta[1]) * self.tasa)
+                cubeta[1] = ahora
+                self._cubetas.move_to_end(clave)
+
+            if cubeta[0] >= 1.0:
+                cubeta[0] -= 1.0
+                return True, 0.0
+            if self.tasa <= 0:
+                return False, 60.0
+            return False, (1.0 - cubeta[0]) / self.tasa
+
+    def _liberar(self, ahora: float) -> None:
+        # Quita cubetas inactivas (llenas) y, si aún no hay espacio, la menos reciente
+        while self._cubetas:
+            _clave, (_fichas, ultimo) = next(iter(self._cubetas.items()))
+            if ahora - ultimo < self._llenado_s:
+                break
+            self._cubetas.popitem(last=False)
+        while len(self._cubetas) >= self.max_claves:
+            self._cubetas.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cubetas)
+
+
+class CupoConcurrencia:
+    # Semáforo sin espera: si no hay cupo se rechaza en lugar de encolar
+
+    def __init__(self, maximo: int, reintentar_s: int = 1):
+        self.maximo = max(1, int(maximo))
+        self.reintentar_s = reintentar_s
+        self._sem = threading.BoundedSemaphore(self.maximo)
+
+    @contextmanager
+    def ocupar(self) -> Iterator[None]:
+        if not self._sem.acquire(blocking=False):
+            raise demasiadas_solicitudes(self.reintentar_s, "Servidor ocupado, reintenta más tarde")
+        try:
+            yield
+        finally:
+            self._sem.release()
+
+
+def demasiadas_solicitudes(espera_s: float, detalle: str = "Demasiadas solicitudes") -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=detalle,
+        headers={"Retry-After": str(max(1, math.ceil(espera_s)))},
+    )
+
+
+limitador_token = LimitadorTasa(LIMITE_TOKEN_RPS, LIMITE_TOKEN_RAFAGA, LIMITE_MAX_CLAVES)
+# Por dirección del cliente: tokens sin caché (búsqueda en la DB o 401)
+limitador_desconocido = LimitadorTasa(LIMITE_DESCONOCIDO_RPS, LIMITE_DESCONOCIDO_RAFAGA, LIMITE_MAX_CLAVES)
+limitador_eui = LimitadorTasa(LIMITE_EUI_RPS, LIMITE_EUI_RAFAGA, LIMITE_MAX_CLAVES)
+cupo_caro = CupoConcurrencia(CONCURRENCIA_CARA_MAX)
+
+
+def _direccion_cliente(request: Request) -> str:
+    return request.client.host if request.client else ""
+
+
+def limitar_por_token(
+    request: Request,
+    db: Session = Depends(get_db),
+    x_api_token: str = Header("", alias="X-API-Token"),
+) -> None:
+    # Autentica primero y limita por usuario. Un token que no está en la caché
+    # de autenticados (caducado, nuevo o falso) gasta antes del cupo de su
+    # dirección: un flood de tokens falsos frena solo a quien lo envía. El
+    # resultado queda en caché y get_current_user no vuelve a la DB.
+    if not LIMITES_ACTIVOS or not x_api_token:
+        return
+    if not token_en_cache(x_api_token):
+        permitido, espera = limitador_desconocido.permitir(_direccion_cliente(request))
+        if not permitido:
+            raise demasiadas_solicitudes(espera)
+    usuario = buscar_usuario_por_token(db, x_api_token)
+    if usuario is None:
+        # get_current_user responde 401
+        return
+    permitido, espera = limitador_token.permitir(usuario.id)
+    if not permitido:
+        raise demasiadas_solicitudes(espera)
+
+
+def limitar_por_eui(eui: str) -> None:
+    if not LIMITES_ACTIVOS:
+        return
+    permitido, espera = limitador_eui.permitir(eui)
+    if not permitido:
+        raise demasiadas_solicitudes(espera)
+
+
+@contextmanager
+def admision_cara(es_cara: bool = True) -> Iterator[None]:
+    if not LIMITES_ACTIVOS or not es_cara:
+        yield
+        return
+    with cupo_caro.ocupar():
+        yield
@@ -0,0 +1,171 @@
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session
+
+from config import (
+    PERFIL_ACTIVO,
+    PERFIL_UMBRAL_MS,
+    PERFIL_TOP_N,
+    PERFIL_MAX_CONSULTAS,
+    PERFIL_EXPLAIN,
+)
+
+logger = logging.getLogger("perfil")
+
+# Perfil del request en curso. El middleware crea el dict antes de llamar a la
+# app; el threadpool de FastAPI copia el contexto, así que las consultas que se
+# ejecutan en otros hilos escriben sobre el mismo objeto.
+_perfil_actual: ContextVar[Optional[Dict[str, Any]]] = ContextVar("perfil_actual", default=None)
+
+
+def _recortar(valor: Any, limite: int = 2000) -> str:
+    s = valor if isinstance(valor, str) else json.dumps(valor, ensure_ascii=False, default=str)
+    return s[:limite] + ("…(truncado)" if len(s) > limite else "")
+
+
+def _parametros_seguros(sql: str, parametros: Any) -> Any:
+    # Las consultas sobre usuarios llevan tokens/hashes: no se registran sus valores
+    if "usuarios" in sql:
+        return "<oculto>"
+    return _recortar(parametros, 500)
+
+
+class TopLentas:
+    # Ranking acotado de los N requests más lentos (min-heap por duración)
+
+    def __init__(self, n: int):
+        self.n = max(1, int(n))
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def agregar(self, registro: Dict[str, Any]) -> None:
+        item = (registro["duracion_ms"], next(self._seq), registro)
+        with self._lock:
+            if len(self._heap) < self.n:
+                heapq.heappush(self._heap, item)
+            elif item[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+
+    def listar(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [r for _d, _s, r in sorted(self._heap, reverse=True)]
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._heap.clear()
+
+
+top_lentas = TopLentas(PERFIL_TOP_N)
+
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    if _perfil_actual.get() is not None:
+        conn.info.setdefault("perfil_inicio", []).append(time.perf_counter())
+
+
+def _despues(conn, cursor, statement, parameters, context, executemany):
+    perfil = _perfil_actual.get()
+    if perfil is None:
+        return
+    pila = conn.info.get("perfil_inicio")
+    if not pila:
+        return
+    duracion_ms = (time.perf_counter() - pila.pop()) * 1000
+    consultas = perfil["consultas"]
+    if len(consultas) >= PERFIL_MAX_CONSULTAS:
+        perfil["consultas_omitidas"] += 1
+        return
+    consultas.append({
+        "sql": _recortar(statement),
+        "parametros": _parametros_seguros(statement, parameters),
+        "filas": cursor.rowcount,
+        "duracion_ms": round(duracion_ms, 2),
+    })
+
+
+def instalar(engine: Engine) -> None:
+    if not PERFIL_ACTIVO:
+        return
+    event.listen(engine, "before_cursor_execute", _antes)
+    event.listen(engine, "after_cursor_execute", _despues)
+    logger.info(f"[PERFIL] activo, umbral={PERFIL_UMBRAL_MS}ms top={PERFIL_TOP_N}")
+
+
+async def middleware_perfil(request: Request, call_next):
+    perfil = {"consultas": [], "consultas_omitidas": 0, "explain": []}
+    token = _perfil_actual.set(perfil)
+    inicio = time.perf_counter()
+    estado = 500
+    try:
+        respuesta = await call_next(request)
+        estado = respuesta.status_code
+        return respuesta
+    finally:
+        _perfil_actual.reset(token)
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        if duracion_ms >= PERFIL_UMBRAL_MS:
+            registro = {
+                "fecha": datetime.now(timezone.utc).isoformat(),
+                "metodo": request.method,
+                "ruta": request.url.path,
+                "query": _recortar(str(request.query_params), 500),
+                "estado": estado,
+                "duracion_ms": round(duracion_ms, 2),
+                "duracion_sql_ms": round(sum(c["duracion_ms"] for c in perfil["consultas"]), 2),
+                **perfil,
+            }
+            top_lentas.agregar(registro)
+            logger.warning(f"[PERFIL] request lento: {_recortar(registro, 8000)}")
+
+
+def ejecutar_perfilado(db: Session, q: Query, usuario: Any) -> list:
+    # Ejecuta `q`; si fue lenta y el usuario es admin, adjunta su
+    # EXPLAIN (ANALYZE, BUFFERS) al perfil del request.
+    inicio = time.perf_counter()
+    filas = q.all()
+    duracion_ms = (time.perf_counter() - inicio) * 1000
+
+    perfil = _perfil_actual.get()
+    if (
+        perfil is not None
+        and PERFIL_EXPLAIN
+        and duracion_ms >= PERFIL_UMBRAL_MS
+        and getattr(usuario, "rol", None) == "admin"
+    ):
+        perfil["explain"].append({
+            "duracion_ms": round(duracion_ms, 2),
+            "plan": capturar_explain(db, q),
+        })
+    return filas
+
+
+def capturar_explain(db: Session, q: Query) -> List[str]:
+    # EXPLAIN ANALYZE vuelve a ejecutar la consulta (solo SELECT): no se
+    # registra a sí misma en el perfil.
+    compilada = q.statement.compile(dialect=db.get_bind().dialect)
+    token = _perfil_actual.set(None)
+    try:
+        filas = db.connection().exec_driver_sql(
+            "EXPLAIN (ANALYZE, BUFFERS) " + str(compilada),
+            compilada.params,
+        ).all()
+        return [f[0] for f in filas]
+    except Exception as e:
+        # Deja la sesión usable para el resto del request
+        db.rollback()
+        logger.warning(f"[PERFIL] EXPLAIN falló: {e}")
+        return [f"EXPLAIN falló: {e}"]
+    finally:
+        _perfil_actual.reset(token)
@@ -2,6 +2,14 @@ import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
+from config import (
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT_S,
+    DB_POOL_RECYCLE_S,
+    DB_CONNECT_TIMEOUT_S,
+)
+
 DB_HOST = os.getenv("POSTGRES_HOST", "postgres")
 DB_PORT = os.getenv("POSTGRES_PORT", "5432")
 DB_NAME = os.getenv("POSTGRES_DB", "ttn")
@@ -10,7 +18,17 @@ DB_PASS = os.getenv("POSTGRES_PASSWORD", "ttn_pass")
 
 DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# El engine no abre conexiones al crearse: cada worker abre su propio pool
+# de forma perezosa (o en el calentamiento del lifespan).
+engine = create_engine(
+    DATABASE_URL,
+    pool_pre_ping=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT_S,
+    pool_recycle=DB_POOL_RECYCLE_S,
+    connect_args={"connect_timeout": DB_CONNECT_TIMEOUT_S},
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -0,0 +1,24 @@
+# Modo multi-worker: gunicorn como gestor de procesos + workers uvicorn.
+# Uso: gunicorn -c gunicorn.conf.py main:app
+import os
+
+from config import WEB_CONCURRENCY, DB_POOL_SIZE, DB_MAX_OVERFLOW
+
+# Puerto interno del contenedor (docker compose publica ${APP_PORT}:8000)
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = WEB_CONCURRENCY
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Cada worker importa la app por su cuenta: engine y pool propios, nada
+# compartido a través del fork.
+preload_app = False
+
+
+def when_ready(server):
+    server.log.info(
+        f"workers={workers} pool_por_worker={DB_POOL_SIZE}+{DB_MAX_OVERFLOW} "
+        f"conexiones_max={workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)}"
+    )
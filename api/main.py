@@ -1,13 +1,15 @@
+import asyncio
 import logging
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from database import Base, engine
-from config import CORS_ORIGINS
-
-# IMPORTANTE: esto fuerza a que SQLAlchemy "registre" los modelos
-# antes de create_all (si no, create_all crea 0 tablas).
-from models import Usuario, UnidadProductiva, Dispositivo, Dato, ValorDato  # noqa: F401
+from database import engine
+from config import CORS_ORIGINS, PERFIL_ACTIVO, APP_ROL
+from core.arranque import calentar
+from core import perfil
 
 from routers import (
     health_router,
@@ -16,12 +18,28 @@ from routers import (
     dispositivos_router,
     ttn_router,
     datos_router,
+    admin_router,
 )
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("api")
 
-app = FastAPI(title="Ingesta TTN + API (Producción-ready)")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # El esquema ya no se crea aquí: se aplica con `alembic upgrade head`
+    # (servicio `migrate` en docker compose) antes de arrancar los workers.
+    app.state.listo = False
+    detener = threading.Event()
+    calentamiento = asyncio.create_task(asyncio.to_thread(calentar, app.state, detener))
+    yield
+    detener.set()
+    if not calentamiento.done():
+        calentamiento.cancel()
+    engine.dispose()
+
+
+app = FastAPI(title="Ingesta TTN + API (Producción-ready)", lifespan=lifespan)
 
 # CORS configurable por variables de entorno
 if CORS_ORIGINS:
@@ -33,13 +51,19 @@ if CORS_ORIGINS:
         allow_headers=["*"],
     )
 
-# MVP: crear tablas (en producción: Alembic)
-Base.metadata.create_all(bind=engine)
+# Perfilado opt-in de requests lentos (PERFIL_ACTIVO=true)
+if PERFIL_ACTIVO:
+    perfil.instalar(engine)
+    app.middleware("http")(perfil.middleware_perfil)
 
-# Routers
+# Routers. APP_ROL permite separar la ingesta (/ttn) de las consultas en
+# despliegues distintos para que no compitan por los mismos workers.
 app.include_router(health_router)
-app.include_router(auth_router)
-app.include_router(unidades_router)
-app.include_router(dispositivos_router)
-app.include_router(ttn_router)
-app.include_router(datos_router)
+if APP_ROL in ("todo", "consulta"):
+    app.include_router(auth_router)
+    app.include_router(unidades_router)
+    app.include_router(dispositivos_router)
+    app.include_router(datos_router)
+    app.include_router(admin_router)
+if APP_ROL in ("todo", "ingesta"):
+    app.include_router(ttn_router)
@@ -0,0 +1,94 @@
+"""esquema inicial (equivalente al antiguo create_all)
+
+Revision ID: 0001_inicial
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_inicial"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "usuarios",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("nombre", sa.String(), nullable=False),
+        sa.Column("correo", sa.String(), nullable=False),
+        sa.Column("hash_contrasena", sa.String(), nullable=False),
+        sa.Column("rol", sa.String(), nullable=False),
+        sa.Column("token", sa.String(), nullable=False),
+        sa.Column("token_restablecer_contrasena", sa.String(), nullable=True),
+    )
+    op.create_index("ix_usuarios_id", "usuarios", ["id"])
+    op.create_index("ix_usuarios_correo", "usuarios", ["correo"], unique=True)
+    op.create_index("ix_usuarios_token", "usuarios", ["token"], unique=True)
+
+    op.create_table(
+        "unidades_productivas",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("usuario_id", sa.Integer(), sa.ForeignKey("usuarios.id"), nullable=False),
+        sa.Column("nombre", sa.String(), nullable=False),
+        sa.Column("area", sa.Float(), nullable=True),
+        sa.Column("descripcion", sa.String(), nullable=True),
+        sa.Column("cualidades", sa.String(), nullable=True),
+        sa.Column("tipo", sa.String(), nullable=True),
+        sa.Column("categoria", sa.String(), nullable=True),
+        sa.Column("direccion", sa.String(), nullable=True),
+        sa.Column("georreferenciacion", sa.String(), nullable=True),
+    )
+    op.create_index("ix_unidades_productivas_id", "unidades_productivas", ["id"])
+    op.create_index("ix_unidades_productivas_usuario_id", "unidades_productivas", ["usuario_id"])
+
+    op.create_table(
+        "dispositivos",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("usuario_id", sa.Integer(), sa.ForeignKey("usuarios.id"), nullable=False),
+        sa.Column("unidad_productiva_id", sa.Integer(), sa.ForeignKey("unidades_productivas.id"), nullable=False),
+        sa.Column("marca", sa.String(), nullable=True),
+        sa.Column("identificador_dispositivo", sa.String(), nullable=True),
+        sa.Column("tipo", sa.String(), nullable=True),
+        sa.Column("eui", sa.String(), nullable=False),
+    )
+    op.create_index("ix_dispositivos_id", "dispositivos", ["id"])
+    op.create_index("ix_dispositivos_usuario_id", "dispositivos", ["usuario_id"])
+    op.create_index("ix_dispositivos_unidad_productiva_id", "dispositivos", ["unidad_productiva_id"])
+    op.create_index("ix_dispositivos_eui", "dispositivos", ["eui"], unique=True)
+
+    op.create_table(
+        "datos",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("dispositivo_id", sa.Integer(), sa.ForeignKey("dispositivos.id"), nullable=False),
+        sa.Column("fecha_hora", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("origen", sa.String(), nullable=False),
+        sa.Column("json_crudo", sa.JSON(), nullable=True),
+        sa.Column("json_decodificado", sa.JSON(), nullable=True),
+        sa.Column("json_normalizado", sa.JSON(), nullable=True),
+    )
+    op.create_index("ix_datos_id", "datos", ["id"])
+    op.create_index("ix_datos_dispositivo_id", "datos", ["dispositivo_id"])
+
+    op.create_table(
+        "valores_dato",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("dato_id", sa.Integer(), sa.ForeignKey("datos.id"), nullable=False),
+        sa.Column("nombre_variable", sa.String(), nullable=False),
+        sa.Column("ruta_variable", sa.String(), nullable=True),
+        sa.Column("unidad", sa.String(), nullable=True),
+        sa.Column("valor", sa.Float(), nullable=False),
+    )
+    op.create_index("ix_valores_dato_id", "valores_dato", ["id"])
+    op.create_index("ix_valores_dato_dato_id", "valores_dato", ["dato_id"])
+    op.create_index("ix_valores_dato_ruta_variable", "valores_dato", ["ruta_variable"])
+
+
+def downgrade() -> None:
+    op.drop_table("valores_dato")
+    op.drop_table("datos")
+    op.drop_table("dispositivos")
+    op.drop_table("unidades_productivas")
+    op.drop_table("usuarios")
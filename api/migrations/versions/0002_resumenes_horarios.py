@@ -0,0 +1,36 @@
+"""rollup horario por dispositivo y variable
+
+Revision ID: 0002_resumenes_horarios
+Revises: 0001_inicial
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_resumenes_horarios"
+down_revision = "0001_inicial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "resumenes_horarios",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("dispositivo_id", sa.Integer(), sa.ForeignKey("dispositivos.id"), nullable=False),
+        sa.Column("ruta_variable", sa.String(), nullable=False),
+        sa.Column("hora", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("unidad", sa.String(), nullable=True),
+        sa.Column("conteo", sa.Integer(), nullable=False),
+        sa.Column("suma", sa.Float(), nullable=False),
+        sa.Column("suma_cuadrados", sa.Float(), nullable=False),
+        sa.Column("minimo", sa.Float(), nullable=False),
+        sa.Column("maximo", sa.Float(), nullable=False),
+        sa.UniqueConstraint("dispositivo_id", "ruta_variable", "hora", name="uq_resumen_horario"),
+    )
+    op.create_index("ix_resumenes_horarios_id", "resumenes_horarios", ["id"])
+    op.create_index("ix_resumenes_horarios_dispositivo_id", "resumenes_horarios", ["dispositivo_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("resumenes_horarios")
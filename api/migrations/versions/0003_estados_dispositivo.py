@@ -0,0 +1,45 @@
+"""índice de estado por dispositivo
+
+Revision ID: 0003_estados_dispositivo
+Revises: 0002_resumenes_horarios
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_estados_dispositivo"
+down_revision = "0002_resumenes_horarios"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "estados_dispositivo",
+        sa.Column("dispositivo_id", sa.Integer(), sa.ForeignKey("dispositivos.id"), primary_key=True),
+        sa.Column("primer_visto", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("ultimo_visto", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("ultimo_f_cnt", sa.Integer(), nullable=True),
+        sa.Column("intervalo_esperado_s", sa.Float(), nullable=True),
+        sa.Column("muestras_intervalo", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("tasa_perdida", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("uplinks", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("uplinks_perdidos", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("huecos_seguidos", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("huecos", sa.JSON(), nullable=False, server_default="[]"),
+    )
+
+    # Semilla: primer/último uplink y conteo de los dispositivos con histórico.
+    # El intervalo esperado se aprende con los siguientes uplinks.
+    op.execute(
+        """
+        INSERT INTO estados_dispositivo (dispositivo_id, primer_visto, ultimo_visto, uplinks)
+        SELECT dispositivo_id, MIN(fecha_hora), MAX(fecha_hora), COUNT(*)
+        FROM datos
+        GROUP BY dispositivo_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("estados_dispositivo")
@@ -0,0 +1,32 @@
+"""cola durable de ingesta
+
+Revision ID: 0004_cola_ingesta
+Revises: 0003_estados_dispositivo
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_cola_ingesta"
+down_revision = "0003_estados_dispositivo"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cola_ingesta",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("hash_eui", sa.Integer(), nullable=False),
+        sa.Column("eui", sa.String(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("recibido_en", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("intentos", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("fallido", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("error", sa.String(), nullable=True),
+    )
+    op.create_index("ix_cola_ingesta_pendientes", "cola_ingesta", ["fallido", "id"])
+
+
+def downgrade() -> None:
+    op.drop_table("cola_ingesta")
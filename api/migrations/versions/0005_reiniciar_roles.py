@@ -0,0 +1,30 @@
+"""reinicia los roles autoasignados en el registro
+
+Revision ID: 0005_reiniciar_roles
+Revises: 0004_cola_ingesta
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from config import ADMIN_CORREOS
+
+revision = "0005_reiniciar_roles"
+down_revision = "0004_cola_ingesta"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Antes /auth/registro aceptaba `rol` del cliente: cualquiera pudo darse
+    # admin. Solo conservan el rol los correos de ADMIN_CORREOS.
+    usuarios = sa.table("usuarios", sa.column("correo", sa.String), sa.column("rol", sa.String))
+    condicion = usuarios.c.rol != "usuario"
+    if ADMIN_CORREOS:
+        condicion = condicion & sa.func.lower(usuarios.c.correo).notin_(ADMIN_CORREOS)
+    op.execute(usuarios.update().where(condicion).values(rol="usuario"))
+
+
+def downgrade() -> None:
+    # Los roles anteriores no se guardan: no hay vuelta atrás
+    pass
@@ -2,6 +2,9 @@ from .usuario import Usuario
 from .unidad_productiva import UnidadProductiva
 from .dispositivo import Dispositivo
 from .dato import Dato, ValorDato
+from .resumen import ResumenHorario
+from .estado_dispositivo import EstadoDispositivo
+from .cola_ingesta import ColaIngesta
 
 __all__ = [
     "Usuario",
@@ -9,4 +12,7 @@ __all__ = [
     "Dispositivo",
     "Dato",
     "ValorDato",
+    "ResumenHorario",
+    "EstadoDispositivo",
+    "ColaIngesta",
 ]
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Boolean, Index
+from sqlalchemy.types import JSON
+from database import Base
+
+# Cola durable de uplinks (modo INGESTA_MODO=cola). Cada fila se borra en la
+# misma transacción que persiste el uplink: si un worker cae, la fila sigue aquí.
+class ColaIngesta(Base):
+    __tablename__ = "cola_ingesta"
+    __table_args__ = (
+        # Lo que cada worker recorre: pendientes en orden de llegada
+        Index("ix_cola_ingesta_pendientes", "fallido", "id"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    # crc32(EUI) estable entre procesos; partición = hash_eui % INGESTA_WORKERS
+    hash_eui = Column(Integer, nullable=False)
+    eui = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    recibido_en = Column(DateTime(timezone=True), nullable=False)
+
+    intentos = Column(Integer, nullable=False, default=0)
+    fallido = Column(Boolean, nullable=False, default=False)
+    error = Column(String, nullable=True)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float
+from sqlalchemy.types import JSON
+from database import Base
+
+# Índice de reporte por dispositivo (una fila por dispositivo), mantenido en la
+# ingesta para responder "quién está silencioso/degradado" sin recorrer `datos`.
+class EstadoDispositivo(Base):
+    __tablename__ = "estados_dispositivo"
+
+    dispositivo_id = Column(Integer, ForeignKey("dispositivos.id"), primary_key=True)
+
+    primer_visto = Column(DateTime(timezone=True), nullable=True)
+    ultimo_visto = Column(DateTime(timezone=True), nullable=True)
+    ultimo_f_cnt = Column(Integer, nullable=True)
+
+    # EWMA de los tiempos entre uplinks (segundos)
+    intervalo_esperado_s = Column(Float, nullable=True)
+    # Deltas normales desde que se (re)aprendió el intervalo, hasta ESTADO_MUESTRAS_APRENDER
+    muestras_intervalo = Column(Integer, nullable=False, default=0)
+    # EWMA de la fracción de uplinks perdidos
+    tasa_perdida = Column(Float, nullable=False, default=0.0)
+
+    uplinks = Column(Integer, nullable=False, default=0)
+    uplinks_perdidos = Column(Integer, nullable=False, default=0)
+    # Huecos consecutivos; al llegar a ESTADO_HUECOS_REAPRENDER se reaprende el intervalo
+    huecos_seguidos = Column(Integer, nullable=False, default=0)
+
+    # Huecos recientes como rangos compactos [inicio_epoch_s, fin_epoch_s]
+    huecos = Column(JSON, nullable=False, default=list)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, UniqueConstraint
+from database import Base
+
+# Rollup por hora de cada variable de un dispositivo. Se mantiene en la ingesta
+# y permite responder estadísticas gruesas sin recorrer `valores_dato`.
+class ResumenHorario(Base):
+    __tablename__ = "resumenes_horarios"
+    __table_args__ = (
+        UniqueConstraint("dispositivo_id", "ruta_variable", "hora", name="uq_resumen_horario"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    dispositivo_id = Column(Integer, ForeignKey("dispositivos.id"), index=True, nullable=False)
+
+    ruta_variable = Column(String, nullable=False)
+    hora = Column(DateTime(timezone=True), nullable=False)
+    unidad = Column(String, nullable=True)
+
+    conteo = Column(Integer, nullable=False, default=0)
+    suma = Column(Float, nullable=False, default=0.0)
+    suma_cuadrados = Column(Float, nullable=False, default=0.0)
+    minimo = Column(Float, nullable=False)
+    maximo = Column(Float, nullable=False)
@@ -4,6 +4,7 @@ from .unidades_productivas import router as unidades_router
 from .dispositivos import router as dispositivos_router
 from .ttn import router as ttn_router
 from .datos import router as datos_router
+from .admin import router as admin_router
 
 __all__ = [
     "health_router",
@@ -12,4 +13,5 @@ __all__ = [
     "dispositivos_router",
     "ttn_router",
     "datos_router",
+    "admin_router",
 ]
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+
+from config import PERFIL_ACTIVO, PERFIL_UMBRAL_MS, PERFIL_TOP_N
+from core.deps import get_admin_user
+from core.perfil import top_lentas
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(get_admin_user)])
+
+@router.get("/perfil/lentas")
+def requests_lentos():
+    # Ranking de este worker (cada worker lleva el suyo)
+    return {
+        "activo": PERFIL_ACTIVO,
+        "umbral_ms": PERFIL_UMBRAL_MS,
+        "top_n": PERFIL_TOP_N,
+        "items": top_lentas.listar(),
+    }
+
+@router.delete("/perfil/lentas")
+def limpiar_requests_lentos():
+    top_lentas.limpiar()
+    return {"status": "ok"}
@@ -35,7 +35,7 @@ def registrar_usuario(body: RegistroUsuarioIn, db: Session = Depends(get_db)):
         nombre=body.nombre.strip(),
         correo=correo,
         hash_contrasena=hashear_contrasena(contrasena_temporal),
-        rol=(body.rol or "usuario").strip(),
+        rol="usuario",
         token=token,
         token_restablecer_contrasena=None,
     )
@@ -1,14 +1,23 @@
 from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import Optional
-from datetime import datetime
+from typing import Literal, Optional
+from datetime import datetime, timedelta, timezone
 
 from database import get_db
+from config import RESUMEN_CACHE_MAX, RESUMEN_CACHE_TTL_S, RESUMEN_MARGEN_CIERRE_S, SERIE_LIMITE_CARO
+from core.cache import CacheTTL
 from core.deps import get_current_user
+from core.limites import limitar_por_token, admision_cara
+from core.perfil import ejecutar_perfilado
 from models import Dispositivo, Dato, ValorDato
-from schemas import ConsultaDatosOut
+from schemas import ConsultaDatosOut, ResumenDatosOut
+from services import estadisticas_crudas, estadisticas_rollup, anidar_resumen
+from services.resumenes import a_utc, horas_en_rango
 
-router = APIRouter(tags=["Datos"])
+router = APIRouter(tags=["Datos"], dependencies=[Depends(limitar_por_token)])
+
+# Solo se cachean rangos cerrados: sus resultados ya no cambian
+_cache_resumen = CacheTTL(RESUMEN_CACHE_MAX, RESUMEN_CACHE_TTL_S)
 
 @router.get("/datos", response_model=ConsultaDatosOut)
 def obtener_datos(
@@ -39,7 +48,7 @@ def obtener_datos(
     if fin:
         q = q.filter(Dato.fecha_hora <= fin)
 
-    rows = q.order_by(Dato.fecha_hora.desc()).limit(limite).all()
+    rows = ejecutar_perfilado(db, q.order_by(Dato.fecha_hora.desc()).limit(limite), usuario)
 
     items = []
     for valor_row, dato_row, disp in rows:
@@ -87,7 +96,9 @@ def serie_dispositivo(
     if fin:
         q = q.filter(Dato.fecha_hora <= fin)
 
-    rows = q.limit(limite).all()
+    # Series grandes compiten por un cupo global; sin cupo -> 429
+    with admision_cara(limite > SERIE_LIMITE_CARO):
+        rows = ejecutar_perfilado(db, q.limit(limite), usuario)
 
     return {
         "dispositivo_id": dispositivo.id,
@@ -95,3 +106,52 @@ def serie_dispositivo(
         "ruta_variable": ruta_variable,
         "puntos": [{"t": r[0], "v": float(r[1]), "u": r[2]} for r in rows],
     }
+
+@router.get("/datos/resumen", response_model=ResumenDatosOut)
+def resumen_datos(
+    inicio: datetime = Query(...),
+    fin: datetime = Query(...),
+    unidad_productiva_id: Optional[int] = Query(None),
+    eui: Optional[str] = Query(None),
+    ruta_variable: Optional[str] = Query(None),
+    detalle: Literal["completo", "basico"] = Query("completo"),
+    db: Session = Depends(get_db),
+    usuario = Depends(get_current_user),
+):
+    # detalle=completo: percentiles, calculado sobre valores_dato
+    # detalle=basico: media/min/max/desviación desde el rollup horario (más barato)
+    inicio, fin = a_utc(inicio), a_utc(fin)
+    if fin <= inicio:
+        raise HTTPException(status_code=400, detail="'fin' debe ser posterior a 'inicio'")
+
+    clave = (usuario.id, inicio, fin, unidad_productiva_id, eui, ruta_variable, detalle)
+    cerrado = fin <= datetime.now(timezone.utc) - timedelta(seconds=RESUMEN_MARGEN_CIERRE_S)
+    if cerrado:
+        en_cache = _cache_resumen.get(clave)
+        if en_cache is not None:
+            return en_cache
+
+    consulta = estadisticas_rollup if detalle == "basico" else estadisticas_crudas
+    with admision_cara(detalle == "completo"):
+        filas = consulta(
+            db,
+            usuario.id,
+            inicio,
+            fin,
+            unidad_productiva_id=unidad_productiva_id,
+            eui=eui,
+            ruta_variable=ruta_variable,
+        )
+    horas = horas_en_rango(inicio, fin)
+
+    resultado = {
+        "inicio": inicio,
+        "fin": fin,
+        "detalle": detalle,
+        "fuente": "resumenes_horarios" if detalle == "basico" else "valores_dato",
+        "horas": horas,
+        "unidades_productivas": anidar_resumen(filas, horas),
+    }
+    if cerrado:
+        _cache_resumen.set(clave, resultado)
+    return resultado
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
+from datetime import datetime, timezone
 
 from database import get_db
 from core.deps import get_current_user
-from models import Dispositivo, UnidadProductiva
-from schemas import DispositivoCreateIn, DispositivoOut
+from core.limites import limitar_por_token
+from models import Dispositivo, UnidadProductiva, EstadoDispositivo
+from schemas import DispositivoCreateIn, DispositivoOut, EstadoDispositivoOut
+from services import clasificar, huecos_como_fechas
 
-router = APIRouter(prefix="/dispositivos", tags=["Dispositivos"])
+router = APIRouter(prefix="/dispositivos", tags=["Dispositivos"], dependencies=[Depends(limitar_por_token)])
 
 @router.post("", response_model=DispositivoOut)
 def crear_dispositivo(
@@ -51,3 +54,41 @@ def listar_dispositivos(
         .order_by(Dispositivo.id.desc())
         .all()
     )
+
+@router.get("/estado", response_model=List[EstadoDispositivoOut])
+def estado_dispositivos(
+    estado: Optional[Literal["ok", "degradado", "silencioso", "sin_datos"]] = Query(None),
+    unidad_productiva_id: Optional[int] = Query(None),
+    incluir_huecos: bool = Query(False),
+    db: Session = Depends(get_db),
+    usuario = Depends(get_current_user),
+):
+    # O(dispositivos): una fila de estados_dispositivo por dispositivo, sin tocar `datos`
+    q = (
+        db.query(Dispositivo, EstadoDispositivo)
+        .outerjoin(EstadoDispositivo, EstadoDispositivo.dispositivo_id == Dispositivo.id)
+        .filter(Dispositivo.usuario_id == usuario.id)
+    )
+    if unidad_productiva_id is not None:
+        q = q.filter(Dispositivo.unidad_productiva_id == unidad_productiva_id)
+
+    ahora = datetime.now(timezone.utc)
+    salida = []
+    for disp, est in q.order_by(Dispositivo.id.desc()).all():
+        clase, silencio_s = clasificar(est, ahora)
+        if estado and clase != estado:
+            continue
+        salida.append({
+            "dispositivo_id": disp.id,
+            "eui": disp.eui,
+            "unidad_productiva_id": disp.unidad_productiva_id,
+            "estado": clase,
+            "ultimo_visto": est.ultimo_visto if est else None,
+            "segundos_sin_datos": silencio_s,
+            "intervalo_esperado_s": est.intervalo_esperado_s if est else None,
+            "tasa_perdida": est.tasa_perdida if est else 0.0,
+            "uplinks": est.uplinks if est else 0,
+            "uplinks_perdidos": est.uplinks_perdidos if est else 0,
+            "huecos": huecos_como_fechas(est.huecos) if est and incluir_huecos else [],
+        })
+    return salida
@@ -1,7 +1,33 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+from core.arranque import verificar_db, verificar_pool, verificar_cola
 
 router = APIRouter(tags=["Health"])
 
 @router.get("/health")
 def health():
+    # Liveness: no toca la base de datos
     return {"status": "ok"}
+
+@router.get("/ready")
+async def ready(request: Request):
+    # Readiness: calentamiento terminado, DB accesible y pool no saturado
+    pool = verificar_pool()
+    # Con el pool agotado, el SELECT 1 esperaría pool_timeout: no se intenta
+    db = await run_in_threadpool(verificar_db) if pool["ok"] else {"ok": False, "error": "pool saturado"}
+    cola = await run_in_threadpool(verificar_cola) if db["ok"] else {"ok": False, "error": "sin db"}
+    calentado = bool(getattr(request.app.state, "listo", False))
+
+    listo = calentado and db["ok"] and pool["ok"]
+    return JSONResponse(
+        status_code=200 if listo else 503,
+        content={
+            "status": "ok" if listo else "no_listo",
+            "calentado": calentado,
+            "db": db,
+            "pool": pool,
+            "cola": cola,
+        },
+    )
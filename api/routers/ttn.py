@@ -1,25 +1,19 @@
 from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional, Tuple, List
+from typing import Any, Dict, Optional
 import uuid
 import logging
-import json
 
 from database import get_db
-from config import TTN_WEBHOOK_SECRET
-from models import Dispositivo, Dato, ValorDato
+from config import TTN_WEBHOOK_SECRET, INGESTA_MODO
+from core.limites import limitar_por_eui
+from models import ColaIngesta
+from services import buscar_dispositivo_por_eui, hash_eui, procesar_uplink, safe_json
 
 router = APIRouter(prefix="/ttn", tags=["TTN"])
 logger = logging.getLogger("ttn")
 
-def _safe_json(obj, limit: int = 4000) -> str:
-    try:
-        s = json.dumps(obj, ensure_ascii=False, default=str)
-        return s[:limit] + ("…(truncado)" if len(s) > limit else "")
-    except Exception:
-        return str(obj)[:limit]
-
 def extraer_eui(payload: Dict[str, Any]) -> Optional[str]:
     eui = (
         payload.get("end_device_ids", {}).get("dev_eui")
@@ -30,53 +24,6 @@ def extraer_eui(payload: Dict[str, Any]) -> Optional[str]:
     )
     return eui.strip() if isinstance(eui, str) else None
 
-def extraer_fecha_hora(payload: Dict[str, Any]) -> Optional[datetime]:
-    ts = payload.get("received_at") or payload.get("time") or payload.get("timestamp")
-    if isinstance(ts, str):
-        try:
-            return datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        except Exception:
-            return None
-    return None
-
-def elegir_payload(uplink_message: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
-    normalized = uplink_message.get("normalized_payload")
-    if isinstance(normalized, dict) and normalized:
-        data = normalized.get("data") if isinstance(normalized.get("data"), dict) else normalized
-        if isinstance(data, dict) and data:
-            return "normalized", data
-
-    decoded = uplink_message.get("decoded_payload")
-    if isinstance(decoded, dict) and decoded:
-        return "decoded", decoded
-
-    return "none", {}
-
-def aplanar_numericos(obj: Any, prefijo: str = "") -> List[Tuple[str, float, Optional[str], str]]:
-    salida: List[Tuple[str, float, Optional[str], str]] = []
-
-    if isinstance(obj, dict):
-        if "value" in obj and isinstance(obj["value"], (int, float)):
-            unidad = obj.get("unit") if isinstance(obj.get("unit"), str) else None
-            nombre = prefijo.split(".")[-1] if prefijo else "value"
-            salida.append((nombre, float(obj["value"]), unidad, prefijo or nombre))
-            return salida
-
-        for k, v in obj.items():
-            ruta = f"{prefijo}.{k}" if prefijo else str(k)
-            salida.extend(aplanar_numericos(v, ruta))
-
-    elif isinstance(obj, list):
-        for i, v in enumerate(obj):
-            ruta = f"{prefijo}[{i}]"
-            salida.extend(aplanar_numericos(v, ruta))
-
-    elif isinstance(obj, (int, float)):
-        nombre = prefijo.split(".")[-1] if prefijo else "value"
-        salida.append((nombre, float(obj), None, prefijo or nombre))
-
-    return salida
-
 @router.post("/webhook")
 async def ttn_webhook(
     request: Request,
@@ -97,56 +44,35 @@ async def ttn_webhook(
 
     eui = extraer_eui(payload) if isinstance(payload, dict) else None
     if not eui:
-        logger.warning(f"[TTN][{rid}] sin eui/dev_eui. payload={_safe_json(payload)}")
+        logger.warning(f"[TTN][{rid}] sin eui/dev_eui. payload={safe_json(payload)}")
         return {"status": "ok", "rid": rid, "note": "sin eui/dev_eui"}
 
-    dispositivo = db.query(Dispositivo).filter(Dispositivo.eui == eui).first()
-    if not dispositivo:
-        logger.warning(f"[TTN][{rid}] dispositivo NO registrado. eui={eui}. payload={_safe_json(payload)}")
-        return {"status": "ok", "rid": rid, "note": f"dispositivo no registrado eui={eui}"}
-
-    uplink = payload.get("uplink_message") if isinstance(payload, dict) else {}
-    uplink = uplink if isinstance(uplink, dict) else {}
-
-    fecha_hora = extraer_fecha_hora(payload) or datetime.now(timezone.utc)
-    origen, payload_elegido = elegir_payload(uplink)
-
-    decoded_payload = uplink.get("decoded_payload")
-    normalized_payload = uplink.get("normalized_payload")
-
-    dato = Dato(
-        dispositivo_id=dispositivo.id,
-        fecha_hora=fecha_hora,
-        origen=origen,
-        json_crudo=payload,
-        json_decodificado=decoded_payload if isinstance(decoded_payload, dict) else None,
-        json_normalizado=normalized_payload if isinstance(normalized_payload, dict) else None,
-    )
-    db.add(dato)
-    db.flush()
-
-    items = aplanar_numericos(payload_elegido) if origen != "none" else []
-    insertados = 0
-    for nombre, valor, unidad, ruta in items:
-        if valor != valor:
-            continue
-        db.add(ValorDato(
-            dato_id=dato.id,
-            nombre_variable=nombre,
-            ruta_variable=ruta,
-            unidad=unidad,
-            valor=valor,
-        ))
-        insertados += 1
-
+    # Un gateway/dispositivo mal configurado no debe saturar la ingesta
+    try:
+        limitar_por_eui(eui)
+    except HTTPException:
+        logger.warning(f"[TTN][{rid}] 429 límite de tasa excedido. eui={eui}")
+        raise
+
+    if INGESTA_MODO == "cola":
+        # Solo se encola (durable en Postgres); los workers de services.ingesta
+        # lo procesan particionado por hash(EUI). Los EUI no registrados se
+        # descartan aquí (búsqueda cacheada): la cola no crece con basura.
+        if not buscar_dispositivo_por_eui(db, eui):
+            logger.warning(f"[TTN][{rid}] dispositivo NO registrado, no se encola. eui={eui}")
+            return {"status": "ok", "rid": rid, "note": f"dispositivo no registrado eui={eui}"}
+        fila = ColaIngesta(
+            hash_eui=hash_eui(eui),
+            eui=eui,
+            payload=payload,
+            recibido_en=datetime.now(timezone.utc),
+        )
+        db.add(fila)
+        db.flush()
+        encolado = fila.id
+        db.commit()
+        return {"status": "ok", "rid": rid, "eui": eui, "encolado": encolado}
+
+    resultado = procesar_uplink(db, payload, eui, rid)
     db.commit()
-
-    return {
-        "status": "ok",
-        "rid": rid,
-        "eui": eui,
-        "dispositivo_id": dispositivo.id,
-        "dato_id": dato.id,
-        "origen": origen,
-        "insertados": insertados,
-    }
+    return resultado
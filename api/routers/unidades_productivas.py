@@ -4,10 +4,11 @@ from typing import List
 
 from database import get_db
 from core.deps import get_current_user
+from core.limites import limitar_por_token
 from models import UnidadProductiva
 from schemas import UnidadProductivaCreateIn, UnidadProductivaOut
 
-router = APIRouter(prefix="/unidades-productivas", tags=["Unidades productivas"])
+router = APIRouter(prefix="/unidades-productivas", tags=["Unidades productivas"], dependencies=[Depends(limitar_por_token)])
 
 @router.post("", response_model=UnidadProductivaOut)
 def crear_unidad_productiva(
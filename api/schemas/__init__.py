@@ -6,8 +6,11 @@ from .auth import (
     ResetConfirmIn, ResetConfirmOut,
 )
 from .unidades_productivas import UnidadProductivaCreateIn, UnidadProductivaOut
-from .dispositivos import DispositivoCreateIn, DispositivoOut
-from .datos import ItemDatoOut, ConsultaDatosOut
+from .dispositivos import DispositivoCreateIn, DispositivoOut, HuecoOut, EstadoDispositivoOut
+from .datos import (
+    ItemDatoOut, ConsultaDatosOut,
+    EstadisticaVariableOut, ResumenDispositivoOut, ResumenUnidadOut, ResumenDatosOut,
+)
 
 __all__ = [
     "TTNWebhookIn",
@@ -16,6 +19,7 @@ __all__ = [
     "ResetRequestIn", "ResetRequestOut",
     "ResetConfirmIn", "ResetConfirmOut",
     "UnidadProductivaCreateIn", "UnidadProductivaOut",
-    "DispositivoCreateIn", "DispositivoOut",
+    "DispositivoCreateIn", "DispositivoOut", "HuecoOut", "EstadoDispositivoOut",
     "ItemDatoOut", "ConsultaDatosOut",
+    "EstadisticaVariableOut", "ResumenDispositivoOut", "ResumenUnidadOut", "ResumenDatosOut",
 ]
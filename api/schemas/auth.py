@@ -4,7 +4,6 @@ from typing import Optional
 class RegistroUsuarioIn(BaseModel):
     nombre: str
     correo: str
-    rol: Optional[str] = "usuario"
 
 class RegistroUsuarioOut(BaseModel):
     usuario_id: int
@@ -14,3 +14,34 @@ class ItemDatoOut(BaseModel):
 
 class ConsultaDatosOut(BaseModel):
     items: List[ItemDatoOut]
+
+class EstadisticaVariableOut(BaseModel):
+    ruta_variable: Optional[str] = None
+    unidad: Optional[str] = None
+    conteo: int
+    media: Optional[float] = None
+    minimo: Optional[float] = None
+    maximo: Optional[float] = None
+    desviacion: Optional[float] = None
+    p10: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    completitud: float
+
+class ResumenDispositivoOut(BaseModel):
+    dispositivo_id: int
+    eui: str
+    variables: List[EstadisticaVariableOut]
+
+class ResumenUnidadOut(BaseModel):
+    unidad_productiva_id: int
+    nombre: str
+    dispositivos: List[ResumenDispositivoOut]
+
+class ResumenDatosOut(BaseModel):
+    inicio: datetime
+    fin: datetime
+    detalle: str
+    fuente: str
+    horas: int
+    unidades_productivas: List[ResumenUnidadOut]
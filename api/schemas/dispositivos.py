@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
+from datetime import datetime
 
 class DispositivoCreateIn(BaseModel):
     unidad_productiva_id: int
@@ -19,3 +20,20 @@ class DispositivoOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+class HuecoOut(BaseModel):
+    inicio: datetime
+    fin: datetime
+
+class EstadoDispositivoOut(BaseModel):
+    dispositivo_id: int
+    eui: str
+    unidad_productiva_id: int
+    estado: str
+    ultimo_visto: Optional[datetime] = None
+    segundos_sin_datos: Optional[float] = None
+    intervalo_esperado_s: Optional[float] = None
+    tasa_perdida: float = 0.0
+    uplinks: int = 0
+    uplinks_perdidos: int = 0
+    huecos: List[HuecoOut] = []
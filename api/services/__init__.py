@@ -0,0 +1,49 @@
+from .resumenes import (
+    acumular_resumen_horario,
+    reconstruir_resumenes,
+    estadisticas_crudas,
+    estadisticas_rollup,
+    anidar_resumen,
+)
+from .dispositivos import DispositivoRef, buscar_dispositivo_por_eui, precargar_dispositivos
+from .estado_dispositivos import (
+    ESTADOS,
+    extraer_f_cnt,
+    registrar_uplink,
+    clasificar,
+    huecos_como_fechas,
+)
+from .decodificadores import (
+    Decodificador,
+    registrar_decodificador,
+    buscar_decodificador,
+    decodificar_frm_payload,
+)
+from .uplinks import safe_json, elegir_payload, aplanar_numericos, procesar_uplink, redecodificar
+from .ingesta import hash_eui
+
+__all__ = [
+    "acumular_resumen_horario",
+    "reconstruir_resumenes",
+    "estadisticas_crudas",
+    "estadisticas_rollup",
+    "anidar_resumen",
+    "DispositivoRef",
+    "buscar_dispositivo_por_eui",
+    "precargar_dispositivos",
+    "ESTADOS",
+    "extraer_f_cnt",
+    "registrar_uplink",
+    "clasificar",
+    "huecos_como_fechas",
+    "Decodificador",
+    "registrar_decodificador",
+    "buscar_decodificador",
+    "decodificar_frm_payload",
+    "safe_json",
+    "elegir_payload",
+    "aplanar_numericos",
+    "procesar_uplink",
+    "redecodificar",
+    "hash_eui",
+]
@@ -0,0 +1,204 @@
+import base64
+import binascii
+import logging
+import struct
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger("decodificadores")
+
+# Un decodificador recibe los bytes de `frm_payload` y el f_port, y devuelve la
+# estructura anidada que espera `aplanar_numericos` ({"soil": {"ec": {"value": .., "unit": ..}}}).
+FuncionDecodificadora = Callable[[bytes, Optional[int]], Dict[str, Any]]
+
+
+class Decodificador(NamedTuple):
+    nombre: str
+    funcion: FuncionDecodificadora
+    # Payload de ejemplo (hex) para el benchmark
+    ejemplo: str
+
+
+# (marca, tipo) normalizados -> decodificador. Una sola búsqueda por uplink:
+# cada decodificador se registra bajo todas sus combinaciones válidas.
+_REGISTRO: Dict[Tuple[str, str], Decodificador] = {}
+
+
+def _clave(marca: Optional[str], tipo: Optional[str]) -> Tuple[str, str]:
+    return ((marca or "").strip().lower(), (tipo or "").strip().lower())
+
+
+def registrar_decodificador(marca: str, tipos: Tuple[str, ...], ejemplo: str):
+    def decorador(funcion: FuncionDecodificadora) -> FuncionDecodificadora:
+        dec = Decodificador(nombre=funcion.__name__, funcion=funcion, ejemplo=ejemplo)
+        for tipo in tipos:
+            _REGISTRO[_clave(marca, tipo)] = dec
+        return funcion
+    return decorador
+
+
+def buscar_decodificador(marca: Optional[str], tipo: Optional[str]) -> Optional[Decodificador]:
+    return _REGISTRO.get(_clave(marca, tipo))
+
+
+def decodificadores_registrados() -> Dict[str, Decodificador]:
+    return {dec.nombre: dec for dec in _REGISTRO.values()}
+
+
+def decodificar_frm_payload(dec: Decodificador, uplink_message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    frm = uplink_message.get("frm_payload")
+    if not isinstance(frm, str) or not frm:
+        return None
+    f_port = uplink_message.get("f_port")
+    try:
+        datos = base64.b64decode(frm, validate=True)
+        salida = dec.funcion(datos, f_port if isinstance(f_port, int) else None)
+    except (binascii.Error, struct.error, ValueError, IndexError) as e:
+        logger.warning(f"[DECODER] {dec.nombre} no pudo decodificar frm_payload={frm[:64]}: {e}")
+        return None
+    return salida or None
+
+
+def _v(valor: float, unidad: Optional[str]) -> Dict[str, Any]:
+    return {"value": valor, "unit": unidad}
+
+
+# ---------------------------------------------------------------------------
+# Dragino
+# ---------------------------------------------------------------------------
+
+# LSE01: BAT(2) TempDS18B20(2) Humedad suelo(2) Temp suelo(2) EC(2) Flags(1)
+_LSE01 = struct.Struct(">HhHhHB")
+
+
+@registrar_decodificador("dragino", ("soil", "lse01"), ejemplo="0ce400000a2807d0012c80")
+def dragino_lse01(datos: bytes, f_port: Optional[int]) -> Dict[str, Any]:
+    bat, _temp_ext, humedad, temp_suelo, ec, _flags = _LSE01.unpack_from(datos)
+    return {
+        "battery": _v((bat & 0x3FFF) / 1000, "V"),
+        "soil": {
+            "moisture": _v(humedad / 100, "%"),
+            "temperature": _v(temp_suelo / 100, "C"),
+            # El sensor reporta uS/cm; se alinea con normalized_payload (mS/cm)
+            "ec": _v(ec / 1000, "mS/cm"),
+        },
+    }
+
+
+# LHT65: BAT(2) Temp SHT(2) Humedad SHT(2) Tipo sensor externo(1) Temp externa(2)
+_LHT65 = struct.Struct(">HhHBh")
+_LHT65_SIN_SENSOR = 0x7FFF
+
+
+@registrar_decodificador("dragino", ("air", "lht65", "lht65n"), ejemplo="cbf60b0d037601099e7fff")
+def dragino_lht65(datos: bytes, f_port: Optional[int]) -> Dict[str, Any]:
+    bat, temp, humedad, tipo_ext, temp_ext = _LHT65.unpack_from(datos)
+    salida: Dict[str, Any] = {
+        "battery": _v((bat & 0x3FFF) / 1000, "V"),
+        "air": {
+            "temperature": _v(temp / 100, "C"),
+            "humidity": _v(humedad / 10, "%"),
+        },
+    }
+    if tipo_ext == 1 and temp_ext != _LHT65_SIN_SENSOR:
+        salida["external"] = {"temperature": _v(temp_ext / 100, "C")}
+    return salida
+
+
+# ---------------------------------------------------------------------------
+# Cayenne LPP (muchos sensores genéricos/baratos)
+# ---------------------------------------------------------------------------
+
+_XYZ = ("x", "y", "z")
+
+# tipo LPP -> (nombre, struct, divisor, unidad, ejes). Con ejes el tipo se
+# anida por eje ({"accelerometer": {"x": .., "y": .., "z": ..}}).
+_LPP_TIPOS: Dict[int, Tuple[str, struct.Struct, float, Optional[str], Optional[Tuple[str, ...]]]] = {
+    0: ("digital_input", struct.Struct(">B"), 1, None, None),
+    1: ("digital_output", struct.Struct(">B"), 1, None, None),
+    2: ("analog_input", struct.Struct(">h"), 100, None, None),
+    3: ("analog_output", struct.Struct(">h"), 100, None, None),
+    101: ("illuminance", struct.Struct(">H"), 1, "lux", None),
+    102: ("presence", struct.Struct(">B"), 1, None, None),
+    103: ("temperature", struct.Struct(">h"), 10, "C", None),
+    104: ("humidity", struct.Struct(">B"), 2, "%", None),
+    113: ("accelerometer", struct.Struct(">hhh"), 1000, "G", _XYZ),
+    115: ("barometer", struct.Struct(">H"), 10, "hPa", None),
+    116: ("voltage", struct.Struct(">H"), 100, "V", None),
+    134: ("gyrometer", struct.Struct(">hhh"), 100, "deg/s", _XYZ),
+}
+
+# GPS: latitud/longitud (0.0001 grados) y altitud (cm) como enteros de 3 bytes
+# con signo; struct no tiene ese formato.
+_LPP_GPS = 136
+_LPP_GPS_BYTES = 9
+
+
+def _int24(datos: bytes, i: int) -> int:
+    return int.from_bytes(datos[i:i + 3], "big", signed=True)
+
+
+@registrar_decodificador("cayenne", ("lpp", ""), ejemplo="03670110056700ff0468500173277c")
+def cayenne_lpp(datos: bytes, f_port: Optional[int]) -> Dict[str, Any]:
+    salida: Dict[str, Any] = {}
+    i, n = 0, len(datos)
+    while i + 2 <= n:
+        canal, tipo = datos[i], datos[i + 1]
+        spec = _LPP_TIPOS.get(tipo)
+        if tipo == _LPP_GPS:
+            tamano = _LPP_GPS_BYTES
+        else:
+            tamano = spec[1].size if spec is not None else None
+        if tamano is None or i + 2 + tamano > n:
+            # Tipo desconocido (no se sabe su tamaño) o truncado: no se puede
+            # seguir, pero se conservan los canales ya decodificados.
+            logger.warning(f"[DECODER] cayenne_lpp: tipo {tipo} no soportado o truncado en el byte {i}")
+            break
+        i += 2
+
+        if tipo == _LPP_GPS:
+            nombre = "gps"
+            valor: Dict[str, Any] = {
+                "latitude": _v(_int24(datos, i) / 10000, "deg"),
+                "longitude": _v(_int24(datos, i + 3) / 10000, "deg"),
+                "altitude": _v(_int24(datos, i + 6) / 100, "m"),
+            }
+        else:
+            nombre, st, divisor, unidad, ejes = spec
+            crudos = st.unpack_from(datos, i)
+            if ejes is None:
+                valor = _v(crudos[0] / divisor, unidad)
+            else:
+                valor = {eje: _v(c / divisor, unidad) for eje, c in zip(ejes, crudos)}
+        i += tamano
+        salida.setdefault(f"ch{canal}", {})[nombre] = valor
+    return salida
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def benchmark(iteraciones: int = 100_000) -> Dict[str, float]:
+    # -> nombre -> microsegundos por uplink (base64 + parseo)
+    import timeit
+
+    resultados = {}
+    for nombre, dec in sorted(decodificadores_registrados().items()):
+        uplink = {"frm_payload": base64.b64encode(bytes.fromhex(dec.ejemplo)).decode(), "f_port": 2}
+        segundos = timeit.timeit(lambda: decodificar_frm_payload(dec, uplink), number=iteraciones)
+        resultados[nombre] = round(segundos / iteraciones * 1e6, 3)
+    return resultados
+
+
+if __name__ == "__main__":
+    # python -m services.decodificadores bench [iteraciones]
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    orden = sys.argv[1] if len(sys.argv) > 1 else "bench"
+    if orden == "bench":
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+        for nombre, us in benchmark(n).items():
+            print(f"{nombre:20s} {us:8.3f} us/uplink")
+    else:
+        sys.exit(f"orden desconocida: {orden}")
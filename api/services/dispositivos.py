@@ -0,0 +1,56 @@
+from typing import NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from config import DISPOSITIVOS_CACHE_MAX, DISPOSITIVOS_CACHE_TTL_S
+from core.cache import CacheTTL
+from models import Dispositivo
+
+
+class DispositivoRef(NamedTuple):
+    # Lo que la ingesta necesita de un dispositivo, sin instancia ORM
+    id: int
+    usuario_id: int
+    unidad_productiva_id: int
+    eui: str
+    marca: Optional[str]
+    tipo: Optional[str]
+
+
+# Solo se cachean aciertos: un EUI recién registrado debe verse de inmediato
+_cache_dispositivos = CacheTTL(DISPOSITIVOS_CACHE_MAX, DISPOSITIVOS_CACHE_TTL_S)
+
+
+def _a_ref(d: Dispositivo) -> DispositivoRef:
+    return DispositivoRef(
+        id=d.id,
+        usuario_id=d.usuario_id,
+        unidad_productiva_id=d.unidad_productiva_id,
+        eui=d.eui,
+        marca=d.marca,
+        tipo=d.tipo,
+    )
+
+
+def buscar_dispositivo_por_eui(db: Session, eui: str) -> Optional[DispositivoRef]:
+    ref = _cache_dispositivos.get(eui)
+    if ref is not None:
+        return ref
+    d = db.query(Dispositivo).filter(Dispositivo.eui == eui).first()
+    if not d:
+        return None
+    ref = _a_ref(d)
+    _cache_dispositivos.set(eui, ref)
+    return ref
+
+
+def precargar_dispositivos(db: Session) -> int:
+    dispositivos = (
+        db.query(Dispositivo)
+        .order_by(Dispositivo.id.desc())
+        .limit(DISPOSITIVOS_CACHE_MAX)
+        .all()
+    )
+    for d in dispositivos:
+        _cache_dispositivos.set(d.eui, _a_ref(d))
+    return len(dispositivos)
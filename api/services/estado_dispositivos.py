@@ -0,0 +1,148 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from config import (
+    ESTADO_EWMA_ALFA,
+    ESTADO_FACTOR_HUECO,
+    ESTADO_FACTOR_SILENCIO,
+    ESTADO_SILENCIO_DEFECTO_S,
+    ESTADO_UMBRAL_PERDIDA,
+    ESTADO_HUECOS_MAX,
+    ESTADO_HUECOS_REAPRENDER,
+    ESTADO_MUESTRAS_APRENDER,
+)
+from models import EstadoDispositivo
+from services.resumenes import a_utc
+
+ESTADOS = ("ok", "degradado", "silencioso", "sin_datos")
+
+
+def extraer_f_cnt(uplink_message: Dict[str, Any]) -> Optional[int]:
+    f_cnt = uplink_message.get("f_cnt")
+    return f_cnt if isinstance(f_cnt, int) and not isinstance(f_cnt, bool) else None
+
+
+def _agregar_hueco(huecos: List[List[int]], inicio: datetime, fin: datetime) -> List[List[int]]:
+    a, b = int(inicio.timestamp()), int(fin.timestamp())
+    nuevos = [list(h) for h in huecos or []]
+    # Fusiona con el último rango si se solapan (p. ej. uplinks tardíos)
+    if nuevos and a <= nuevos[-1][1]:
+        nuevos[-1][1] = max(nuevos[-1][1], b)
+    else:
+        nuevos.append([a, b])
+    return nuevos[-ESTADO_HUECOS_MAX:]
+
+
+def registrar_uplink(
+    db: Session,
+    dispositivo_id: int,
+    fecha_hora: datetime,
+    f_cnt: Optional[int] = None,
+) -> EstadoDispositivo:
+    # Crea la fila si no existe y la bloquea: ingestas concurrentes del mismo
+    # dispositivo (varios workers) se serializan sobre ella.
+    db.execute(
+        pg_insert(EstadoDispositivo.__table__)
+        .values(dispositivo_id=dispositivo_id)
+        .on_conflict_do_nothing(index_elements=["dispositivo_id"])
+    )
+    estado = (
+        db.query(EstadoDispositivo)
+        .filter(EstadoDispositivo.dispositivo_id == dispositivo_id)
+        .with_for_update()
+        .one()
+    )
+
+    fecha_hora = a_utc(fecha_hora)
+    estado.uplinks = (estado.uplinks or 0) + 1
+
+    if estado.ultimo_visto is None:
+        estado.primer_visto = fecha_hora
+        estado.ultimo_visto = fecha_hora
+        estado.ultimo_f_cnt = f_cnt
+        return estado
+
+    delta = (fecha_hora - estado.ultimo_visto).total_seconds()
+    if delta <= 0:
+        # Duplicado o uplink fuera de orden: cuenta, pero no mueve el reloj
+        return estado
+
+    intervalo = estado.intervalo_esperado_s
+    es_hueco = intervalo is not None and delta > ESTADO_FACTOR_HUECO * intervalo
+    con_f_cnt = f_cnt is not None and estado.ultimo_f_cnt is not None
+
+    # Los huecos nunca alimentan la EWMA (un dispositivo con pérdidas inflaría
+    # su propio intervalo). El intervalo solo se reaprende si:
+    # - el hueco trae f_cnt consecutivo: no se perdió nada, el periodo real
+    #   es más largo (p. ej. el dispositivo pasó de 5 a 30 min);
+    # - se acumulan ESTADO_HUECOS_REAPRENDER huecos sin deltas normales entre medio.
+    if es_hueco and (
+        (con_f_cnt and f_cnt == estado.ultimo_f_cnt + 1)
+        or (estado.huecos_seguidos or 0) + 1 >= ESTADO_HUECOS_REAPRENDER
+    ):
+        es_hueco = False
+        intervalo = None
+
+    # Con pocas muestras el intervalo aún no es fiable: no se estiman pérdidas
+    aprendiendo = intervalo is None or (estado.muestras_intervalo or 0) < ESTADO_MUESTRAS_APRENDER
+
+    # Pérdidas: exactas por f_cnt si TTN lo envía; si no, estimadas por tiempo
+    perdidos = 0
+    if con_f_cnt:
+        if f_cnt > estado.ultimo_f_cnt:
+            perdidos = f_cnt - estado.ultimo_f_cnt - 1
+        # f_cnt <= anterior: reinicio/rejoin del dispositivo, no hay pérdida medible
+    elif es_hueco and not aprendiendo:
+        perdidos = max(0, round(delta / intervalo) - 1)
+
+    if intervalo is None:
+        estado.intervalo_esperado_s = delta
+        estado.muestras_intervalo = 1
+        estado.huecos_seguidos = 0
+    elif es_hueco:
+        if perdidos or not aprendiendo:
+            estado.huecos = _agregar_hueco(estado.huecos, estado.ultimo_visto, fecha_hora)
+        estado.huecos_seguidos = (estado.huecos_seguidos or 0) + 1
+    else:
+        estado.intervalo_esperado_s = ESTADO_EWMA_ALFA * delta + (1 - ESTADO_EWMA_ALFA) * intervalo
+        estado.muestras_intervalo = min((estado.muestras_intervalo or 0) + 1, ESTADO_MUESTRAS_APRENDER)
+        estado.huecos_seguidos = 0
+
+    muestra = perdidos / (perdidos + 1)
+    estado.tasa_perdida = ESTADO_EWMA_ALFA * muestra + (1 - ESTADO_EWMA_ALFA) * (estado.tasa_perdida or 0.0)
+    estado.uplinks_perdidos = (estado.uplinks_perdidos or 0) + perdidos
+    estado.ultimo_visto = fecha_hora
+    if f_cnt is not None:
+        estado.ultimo_f_cnt = f_cnt
+    return estado
+
+
+def clasificar(estado: Optional[EstadoDispositivo], ahora: datetime) -> Tuple[str, Optional[float]]:
+    # -> (estado, segundos desde el último uplink)
+    if estado is None or estado.ultimo_visto is None:
+        return "sin_datos", None
+
+    silencio_s = max(0.0, (ahora - estado.ultimo_visto).total_seconds())
+    if estado.intervalo_esperado_s:
+        limite = ESTADO_FACTOR_SILENCIO * estado.intervalo_esperado_s
+    else:
+        limite = ESTADO_SILENCIO_DEFECTO_S
+
+    if silencio_s > limite:
+        return "silencioso", silencio_s
+    if (estado.tasa_perdida or 0.0) > ESTADO_UMBRAL_PERDIDA:
+        return "degradado", silencio_s
+    return "ok", silencio_s
+
+
+def huecos_como_fechas(huecos: Optional[List[List[int]]]) -> List[Dict[str, datetime]]:
+    return [
+        {
+            "inicio": datetime.fromtimestamp(a, tz=timezone.utc),
+            "fin": datetime.fromtimestamp(b, tz=timezone.utc),
+        }
+        for a, b in (huecos or [])
+    ]
@@ -0,0 +1,134 @@
+import logging
+import multiprocessing
+import signal
+import threading
+import zlib
+from typing import Callable, Optional, Tuple
+
+from sqlalchemy import func, text
+
+from config import (
+    INGESTA_WORKERS,
+    INGESTA_LOTE,
+    INGESTA_ESPERA_S,
+    INGESTA_MAX_INTENTOS,
+)
+from database import engine, SessionLocal
+from models import ColaIngesta
+from services.uplinks import procesar_uplink
+
+logger = logging.getLogger("ingesta")
+
+# Primer entero de pg_advisory_lock(int, int); el segundo es la partición
+_CLAVE_LOCK = 7462
+
+
+def hash_eui(eui: str) -> int:
+    # hash() de Python cambia entre procesos; crc32 no
+    return zlib.crc32(eui.strip().upper().encode()) & 0x7FFFFFFF
+
+
+def procesar_lote(particion: int, total: int, procesar: Callable) -> Tuple[int, bool]:
+    # -> (uplinks procesados, hubo error)
+    # Toma en orden de llegada los pendientes de la partición. Cada uplink va en
+    # un savepoint y su fila se borra en la misma transacción: si el proceso
+    # cae antes del commit, nada se pierde ni se duplica.
+    procesados = 0
+    with SessionLocal() as db:
+        filas = (
+            db.query(ColaIngesta)
+            .filter(
+                ColaIngesta.fallido.is_(False),
+                func.mod(ColaIngesta.hash_eui, total) == particion,
+            )
+            .order_by(ColaIngesta.id)
+            .limit(INGESTA_LOTE)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        error = False
+        for fila in filas:
+            try:
+                with db.begin_nested():
+                    procesar(db, fila.payload, fila.eui, f"q{fila.id}", fila.recibido_en)
+                db.delete(fila)
+                procesados += 1
+            except Exception as e:
+                logger.exception(f"[INGESTA][p{particion}] fallo procesando fila={fila.id} eui={fila.eui}")
+                fila.intentos += 1
+                fila.error = str(e)[:500]
+                if fila.intentos >= INGESTA_MAX_INTENTOS:
+                    # Se aparta para no bloquear la partición; queda para revisión
+                    fila.fallido = True
+                error = True
+                # Se corta el lote: los siguientes del mismo EUI no deben adelantarse
+                break
+        db.commit()
+    return procesados, error
+
+
+def consumir_particion(particion: int, total: int, detener: Optional[threading.Event] = None) -> None:
+    detener = detener or threading.Event()
+    with engine.connect() as conn_lock:
+        # Un único consumidor por partición mantiene el orden por dispositivo
+        while not detener.is_set():
+            adquirido = conn_lock.execute(
+                text("SELECT pg_try_advisory_lock(:clave, :particion)"),
+                {"clave": _CLAVE_LOCK, "particion": particion},
+            ).scalar()
+            conn_lock.commit()
+            if adquirido:
+                break
+            logger.info(f"[INGESTA][p{particion}] otra instancia tiene la partición, esperando")
+            detener.wait(5)
+
+        logger.info(f"[INGESTA][p{particion}] consumiendo partición {particion}/{total}")
+        espera = INGESTA_ESPERA_S
+        while not detener.is_set():
+            procesados, error = procesar_lote(particion, total, procesar_uplink)
+            if procesados and not error:
+                espera = INGESTA_ESPERA_S
+                continue
+            if error:
+                espera = min(espera * 2, 30.0)
+            detener.wait(espera)
+
+
+def _worker(particion: int, total: int) -> None:
+    logging.basicConfig(level=logging.INFO)
+    detener = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: detener.set())
+    signal.signal(signal.SIGINT, lambda *_: detener.set())
+    consumir_particion(particion, total, detener)
+
+
+def supervisar(total: int = INGESTA_WORKERS) -> None:
+    # Un proceso por partición; si uno muere se relanza (sus filas siguen en la cola)
+    ctx = multiprocessing.get_context("spawn")
+    procesos = {}
+    detener = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: detener.set())
+    signal.signal(signal.SIGINT, lambda *_: detener.set())
+
+    while not detener.is_set():
+        for particion in range(total):
+            p = procesos.get(particion)
+            if p is not None and p.is_alive():
+                continue
+            if p is not None:
+                logger.warning(f"[INGESTA] worker p{particion} terminó (código {p.exitcode}), relanzando")
+            p = ctx.Process(target=_worker, args=(particion, total), name=f"ingesta-p{particion}")
+            p.start()
+            procesos[particion] = p
+        detener.wait(1)
+
+    for p in procesos.values():
+        p.terminate()
+    for p in procesos.values():
+        p.join(timeout=30)
+
+
+if __name__ == "__main__":
+    # python -m services.ingesta
+    logging.basicConfig(level=logging.INFO)
+    supervisar()
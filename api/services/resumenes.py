@@ -0,0 +1,329 @@
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, distinct, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from models import Dato, Dispositivo, ResumenHorario, UnidadProductiva, ValorDato
+
+PERCENTILES = (0.1, 0.5, 0.9)
+
+
+def a_utc(dt: datetime) -> datetime:
+    # Fechas sin zona horaria se asumen en UTC
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def truncar_hora(dt: datetime) -> datetime:
+    return a_utc(dt).replace(minute=0, second=0, microsecond=0)
+
+
+def horas_en_rango(inicio: datetime, fin: datetime) -> int:
+    return max(1, math.ceil((fin - inicio).total_seconds() / 3600))
+
+
+# ---------------------------------------------------------------------------
+# Mantenimiento del rollup
+# ---------------------------------------------------------------------------
+
+def acumular_resumen_horario(
+    db: Session,
+    dispositivo_id: int,
+    fecha_hora: datetime,
+    items: Iterable[Tuple[str, float, Optional[str], str]],
+) -> int:
+    # Agrupa primero en memoria: un mismo INSERT ... ON CONFLICT no puede tocar
+    # la misma fila dos veces.
+    hora = truncar_hora(fecha_hora)
+    acumulado: Dict[str, Dict[str, Any]] = {}
+    for _nombre, valor, unidad, ruta in items:
+        fila = acumulado.get(ruta)
+        if fila is None:
+            acumulado[ruta] = {
+                "dispositivo_id": dispositivo_id,
+                "ruta_variable": ruta,
+                "hora": hora,
+                "unidad": unidad,
+                "conteo": 1,
+                "suma": valor,
+                "suma_cuadrados": valor * valor,
+                "minimo": valor,
+                "maximo": valor,
+            }
+            continue
+        fila["conteo"] += 1
+        fila["suma"] += valor
+        fila["suma_cuadrados"] += valor * valor
+        fila["minimo"] = min(fila["minimo"], valor)
+        fila["maximo"] = max(fila["maximo"], valor)
+        fila["unidad"] = unidad or fila["unidad"]
+
+    if not acumulado:
+        return 0
+
+    tabla = ResumenHorario.__table__
+    stmt = pg_insert(tabla).values(list(acumulado.values()))
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_resumen_horario",
+        set_={
+            "conteo": tabla.c.conteo + stmt.excluded.conteo,
+            "suma": tabla.c.suma + stmt.excluded.suma,
+            "suma_cuadrados": tabla.c.suma_cuadrados + stmt.excluded.suma_cuadrados,
+            "minimo": func.least(tabla.c.minimo, stmt.excluded.minimo),
+            "maximo": func.greatest(tabla.c.maximo, stmt.excluded.maximo),
+            "unidad": func.coalesce(stmt.excluded.unidad, tabla.c.unidad),
+        },
+    )
+    db.execute(stmt)
+    return len(acumulado)
+
+
+def reconstruir_resumenes(db: Session, desde: Optional[datetime] = None) -> None:
+    # Recalcula el rollup desde `valores_dato` (backfill o reparación).
+    hora = func.date_trunc("hour", Dato.fecha_hora)
+    origen = (
+        select(
+            Dato.dispositivo_id,
+            ValorDato.ruta_variable,
+            hora,
+            func.max(ValorDato.unidad),
+            func.count(ValorDato.id),
+            func.sum(ValorDato.valor),
+            func.sum(ValorDato.valor * ValorDato.valor),
+            func.min(ValorDato.valor),
+            func.max(ValorDato.valor),
+        )
+        .join(Dato, ValorDato.dato_id == Dato.id)
+        .where(ValorDato.ruta_variable.isnot(None))
+        .group_by(Dato.dispositivo_id, ValorDato.ruta_variable, hora)
+    )
+    borrar = delete(ResumenHorario)
+
+    if desde is not None:
+        desde = truncar_hora(desde)
+        origen = origen.where(Dato.fecha_hora >= desde)
+        borrar = borrar.where(ResumenHorario.hora >= desde)
+
+    # El bloqueo (incompatible con los INSERT/UPDATE de la ingesta) evita que un
+    # upsert del webhook se cuele entre el DELETE y el INSERT ... SELECT: la
+    # ingesta espera hasta el commit y luego acumula sobre las filas recalculadas.
+    db.execute(text("LOCK TABLE resumenes_horarios IN SHARE ROW EXCLUSIVE MODE"))
+    # date_trunc usa la zona de la sesión; la ingesta trunca en UTC
+    db.execute(text("SET LOCAL TIME ZONE 'UTC'"))
+    db.execute(borrar)
+    db.execute(
+        insert(ResumenHorario).from_select(
+            [
+                "dispositivo_id", "ruta_variable", "hora", "unidad",
+                "conteo", "suma", "suma_cuadrados", "minimo", "maximo",
+            ],
+            origen,
+        )
+    )
+    db.commit()
+
+
+# ---------------------------------------------------------------------------
+# Consultas de resumen
+# ---------------------------------------------------------------------------
+
+def _filtros_comunes(q, usuario_id, unidad_productiva_id, eui):
+    q = q.filter(Dispositivo.usuario_id == usuario_id)
+    if unidad_productiva_id is not None:
+        q = q.filter(Dispositivo.unidad_productiva_id == unidad_productiva_id)
+    if eui:
+        q = q.filter(Dispositivo.eui == eui)
+    return q
+
+
+def estadisticas_crudas(
+    db: Session,
+    usuario_id: int,
+    inicio: datetime,
+    fin: datetime,
+    unidad_productiva_id: Optional[int] = None,
+    eui: Optional[str] = None,
+    ruta_variable: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    # Estadísticas completas (incluye percentiles) en una sola consulta sobre valores_dato
+    hora = func.date_trunc("hour", Dato.fecha_hora)
+    q = (
+        db.query(
+            UnidadProductiva.id,
+            UnidadProductiva.nombre,
+            Dispositivo.id,
+            Dispositivo.eui,
+            ValorDato.ruta_variable,
+            func.max(ValorDato.unidad),
+            func.count(ValorDato.id),
+            func.avg(ValorDato.valor),
+            func.min(ValorDato.valor),
+            func.max(ValorDato.valor),
+            func.stddev_samp(ValorDato.valor),
+            *[func.percentile_cont(p).within_group(ValorDato.valor.asc()) for p in PERCENTILES],
+            func.count(distinct(hora)),
+        )
+        .join(Dato, ValorDato.dato_id == Dato.id)
+        .join(Dispositivo, Dato.dispositivo_id == Dispositivo.id)
+        .join(UnidadProductiva, Dispositivo.unidad_productiva_id == UnidadProductiva.id)
+        .filter(Dato.fecha_hora >= inicio, Dato.fecha_hora < fin)
+    )
+    q = _filtros_comunes(q, usuario_id, unidad_productiva_id, eui)
+    if ruta_variable:
+        q = q.filter(ValorDato.ruta_variable == ruta_variable)
+
+    q = q.group_by(
+        UnidadProductiva.id, UnidadProductiva.nombre,
+        Dispositivo.id, Dispositivo.eui,
+        ValorDato.ruta_variable,
+    ).order_by(UnidadProductiva.id, Dispositivo.id, ValorDato.ruta_variable)
+
+    salida = []
+    for (up_id, up_nombre, disp_id, disp_eui, ruta, unidad, conteo, media, minimo, maximo,
+         desviacion, p10, p50, p90, horas_con_datos) in q.all():
+        salida.append({
+            "unidad_productiva_id": up_id,
+            "unidad_productiva_nombre": up_nombre,
+            "dispositivo_id": disp_id,
+            "eui": disp_eui,
+            "ruta_variable": ruta,
+            "unidad": unidad,
+            "conteo": int(conteo),
+            "media": _float(media),
+            "minimo": _float(minimo),
+            "maximo": _float(maximo),
+            "desviacion": _float(desviacion),
+            "p10": _float(p10),
+            "p50": _float(p50),
+            "p90": _float(p90),
+            "horas_con_datos": int(horas_con_datos),
+        })
+    return salida
+
+
+def estadisticas_rollup(
+    db: Session,
+    usuario_id: int,
+    inicio: datetime,
+    fin: datetime,
+    unidad_productiva_id: Optional[int] = None,
+    eui: Optional[str] = None,
+    ruta_variable: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    # Estadísticas gruesas desde resumenes_horarios (granularidad de hora, sin percentiles)
+    q = (
+        db.query(
+            UnidadProductiva.id,
+            UnidadProductiva.nombre,
+            Dispositivo.id,
+            Dispositivo.eui,
+            ResumenHorario.ruta_variable,
+            func.max(ResumenHorario.unidad),
+            func.sum(ResumenHorario.conteo),
+            func.sum(ResumenHorario.suma),
+            func.sum(ResumenHorario.suma_cuadrados),
+            func.min(ResumenHorario.minimo),
+            func.max(ResumenHorario.maximo),
+            func.count(ResumenHorario.id),
+        )
+        .join(Dispositivo, ResumenHorario.dispositivo_id == Dispositivo.id)
+        .join(UnidadProductiva, Dispositivo.unidad_productiva_id == UnidadProductiva.id)
+        .filter(ResumenHorario.hora >= truncar_hora(inicio), ResumenHorario.hora < fin)
+    )
+    q = _filtros_comunes(q, usuario_id, unidad_productiva_id, eui)
+    if ruta_variable:
+        q = q.filter(ResumenHorario.ruta_variable == ruta_variable)
+
+    q = q.group_by(
+        UnidadProductiva.id, UnidadProductiva.nombre,
+        Dispositivo.id, Dispositivo.eui,
+        ResumenHorario.ruta_variable,
+    ).order_by(UnidadProductiva.id, Dispositivo.id, ResumenHorario.ruta_variable)
+
+    salida = []
+    for (up_id, up_nombre, disp_id, disp_eui, ruta, unidad, conteo, suma, suma_cuadrados,
+         minimo, maximo, horas_con_datos) in q.all():
+        n = int(conteo or 0)
+        media = float(suma) / n if n else None
+        desviacion = None
+        if n > 1:
+            # Varianza muestral (equivalente a stddev_samp)
+            varianza = (float(suma_cuadrados) - float(suma) ** 2 / n) / (n - 1)
+            desviacion = math.sqrt(max(varianza, 0.0))
+        salida.append({
+            "unidad_productiva_id": up_id,
+            "unidad_productiva_nombre": up_nombre,
+            "dispositivo_id": disp_id,
+            "eui": disp_eui,
+            "ruta_variable": ruta,
+            "unidad": unidad,
+            "conteo": n,
+            "media": media,
+            "minimo": _float(minimo),
+            "maximo": _float(maximo),
+            "desviacion": desviacion,
+            "p10": None,
+            "p50": None,
+            "p90": None,
+            "horas_con_datos": int(horas_con_datos),
+        })
+    return salida
+
+
+def anidar_resumen(filas: List[Dict[str, Any]], horas_totales: int) -> List[Dict[str, Any]]:
+    # filas (ordenadas) -> UnidadProductiva -> Dispositivo -> variables
+    unidades: List[Dict[str, Any]] = []
+    unidad_actual: Optional[Dict[str, Any]] = None
+    disp_actual: Optional[Dict[str, Any]] = None
+
+    for f in filas:
+        if unidad_actual is None or unidad_actual["unidad_productiva_id"] != f["unidad_productiva_id"]:
+            unidad_actual = {
+                "unidad_productiva_id": f["unidad_productiva_id"],
+                "nombre": f["unidad_productiva_nombre"],
+                "dispositivos": [],
+            }
+            unidades.append(unidad_actual)
+            disp_actual = None
+        if disp_actual is None or disp_actual["dispositivo_id"] != f["dispositivo_id"]:
+            disp_actual = {
+                "dispositivo_id": f["dispositivo_id"],
+                "eui": f["eui"],
+                "variables": [],
+            }
+            unidad_actual["dispositivos"].append(disp_actual)
+
+        disp_actual["variables"].append({
+            "ruta_variable": f["ruta_variable"],
+            "unidad": f["unidad"],
+            "conteo": f["conteo"],
+            "media": f["media"],
+            "minimo": f["minimo"],
+            "maximo": f["maximo"],
+            "desviacion": f["desviacion"],
+            "p10": f["p10"],
+            "p50": f["p50"],
+            "p90": f["p90"],
+            # Completitud: fracción de horas del rango con al menos una muestra
+            "completitud": min(1.0, f["horas_con_datos"] / horas_totales),
+        })
+
+    return unidades
+
+
+def _float(v) -> Optional[float]:
+    return float(v) if v is not None else None
+
+
+if __name__ == "__main__":
+    # Backfill manual: python -m services.resumenes [desde_iso]
+    import sys
+    from database import SessionLocal
+
+    desde_arg = datetime.fromisoformat(sys.argv[1].replace("Z", "+00:00")) if len(sys.argv) > 1 else None
+    with SessionLocal() as sesion:
+        reconstruir_resumenes(sesion, desde_arg)
@@ -0,0 +1,211 @@
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from models import Dato, Dispositivo, ValorDato
+from services.decodificadores import Decodificador, buscar_decodificador, decodificar_frm_payload
+from services.dispositivos import buscar_dispositivo_por_eui
+from services.estado_dispositivos import extraer_f_cnt, registrar_uplink
+from services.resumenes import acumular_resumen_horario
+
+logger = logging.getLogger("uplinks")
+
+
+def safe_json(obj, limit: int = 4000) -> str:
+    try:
+        s = json.dumps(obj, ensure_ascii=False, default=str)
+        return s[:limit] + ("…(truncado)" if len(s) > limit else "")
+    except Exception:
+        return str(obj)[:limit]
+
+
+def extraer_fecha_hora(payload: Dict[str, Any]) -> Optional[datetime]:
+    ts = payload.get("received_at") or payload.get("time") or payload.get("timestamp")
+    if isinstance(ts, str):
+        try:
+            return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+        except Exception:
+            return None
+    return None
+
+
+def elegir_payload(
+    uplink_message: Dict[str, Any],
+    decodificador: Optional[Decodificador] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    normalized = uplink_message.get("normalized_payload")
+    if isinstance(normalized, dict) and normalized:
+        data = normalized.get("data") if isinstance(normalized.get("data"), dict) else normalized
+        if isinstance(data, dict) and data:
+            return "normalized", data
+
+    decoded = uplink_message.get("decoded_payload")
+    if isinstance(decoded, dict) and decoded:
+        return "decoded", decoded
+
+    # Solo frm_payload: decodificador local según marca/tipo del dispositivo
+    if decodificador is not None:
+        local = decodificar_frm_payload(decodificador, uplink_message)
+        if local:
+            return "local", local
+
+    return "none", {}
+
+
+def aplanar_numericos(obj: Any, prefijo: str = "") -> List[Tuple[str, float, Optional[str], str]]:
+    salida: List[Tuple[str, float, Optional[str], str]] = []
+
+    if isinstance(obj, dict):
+        if "value" in obj and isinstance(obj["value"], (int, float)):
+            unidad = obj.get("unit") if isinstance(obj.get("unit"), str) else None
+            nombre = prefijo.split(".")[-1] if prefijo else "value"
+            salida.append((nombre, float(obj["value"]), unidad, prefijo or nombre))
+            return salida
+
+        for k, v in obj.items():
+            ruta = f"{prefijo}.{k}" if prefijo else str(k)
+            salida.extend(aplanar_numericos(v, ruta))
+
+    elif isinstance(obj, list):
+        for i, v in enumerate(obj):
+            ruta = f"{prefijo}[{i}]"
+            salida.extend(aplanar_numericos(v, ruta))
+
+    elif isinstance(obj, (int, float)):
+        nombre = prefijo.split(".")[-1] if prefijo else "value"
+        salida.append((nombre, float(obj), None, prefijo or nombre))
+
+    return salida
+
+
+def procesar_uplink(
+    db: Session,
+    payload: Dict[str, Any],
+    eui: str,
+    rid: str,
+    recibido_en: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    # Persiste un uplink (dato, valores, rollup, estado). No hace commit: lo
+    # decide quien llama (webhook directo o worker de la cola, por lotes).
+    dispositivo = buscar_dispositivo_por_eui(db, eui)
+    if not dispositivo:
+        logger.warning(f"[TTN][{rid}] dispositivo NO registrado. eui={eui}. payload={safe_json(payload)}")
+        return {"status": "ok", "rid": rid, "note": f"dispositivo no registrado eui={eui}"}
+
+    uplink = payload.get("uplink_message") if isinstance(payload, dict) else {}
+    uplink = uplink if isinstance(uplink, dict) else {}
+
+    fecha_hora = extraer_fecha_hora(payload) or recibido_en or datetime.now(timezone.utc)
+    origen, payload_elegido = elegir_payload(
+        uplink, buscar_decodificador(dispositivo.marca, dispositivo.tipo)
+    )
+
+    decoded_payload = payload_elegido if origen == "local" else uplink.get("decoded_payload")
+    normalized_payload = uplink.get("normalized_payload")
+
+    dato = Dato(
+        dispositivo_id=dispositivo.id,
+        fecha_hora=fecha_hora,
+        origen=origen,
+        json_crudo=payload,
+        json_decodificado=decoded_payload if isinstance(decoded_payload, dict) else None,
+        json_normalizado=normalized_payload if isinstance(normalized_payload, dict) else None,
+    )
+    db.add(dato)
+    db.flush()
+
+    items = aplanar_numericos(payload_elegido) if origen != "none" else []
+    validos = []
+    for nombre, valor, unidad, ruta in items:
+        if valor != valor:
+            continue
+        db.add(ValorDato(
+            dato_id=dato.id,
+            nombre_variable=nombre,
+            ruta_variable=ruta,
+            unidad=unidad,
+            valor=valor,
+        ))
+        validos.append((nombre, valor, unidad, ruta))
+    insertados = len(validos)
+
+    # Rollup horario en la misma transacción que los valores crudos
+    acumular_resumen_horario(db, dispositivo.id, fecha_hora, validos)
+    registrar_uplink(db, dispositivo.id, fecha_hora, extraer_f_cnt(uplink))
+
+    return {
+        "status": "ok",
+        "rid": rid,
+        "eui": eui,
+        "dispositivo_id": dispositivo.id,
+        "dato_id": dato.id,
+        "origen": origen,
+        "insertados": insertados,
+    }
+
+
+def redecodificar(db: Session, eui: Optional[str] = None, lote: int = 500) -> Dict[str, int]:
+    # Recorre los `datos` sin valores (origen="none") y los decodifica desde
+    # json_crudo con el decodificador de su dispositivo. Paginado por id.
+    conteo = {"revisados": 0, "decodificados": 0, "valores": 0}
+    ultimo_id = 0
+    while True:
+        q = (
+            db.query(Dato, Dispositivo.marca, Dispositivo.tipo)
+            .join(Dispositivo, Dato.dispositivo_id == Dispositivo.id)
+            .filter(Dato.origen == "none", Dato.id > ultimo_id)
+        )
+        if eui:
+            q = q.filter(Dispositivo.eui == eui)
+        filas = q.order_by(Dato.id).limit(lote).all()
+        if not filas:
+            break
+
+        for dato, marca, tipo in filas:
+            ultimo_id = dato.id
+            conteo["revisados"] += 1
+            dec = buscar_decodificador(marca, tipo)
+            crudo = dato.json_crudo if isinstance(dato.json_crudo, dict) else {}
+            uplink = crudo.get("uplink_message")
+            if dec is None or not isinstance(uplink, dict):
+                continue
+            decodificado = decodificar_frm_payload(dec, uplink)
+            if not decodificado:
+                continue
+
+            validos = [it for it in aplanar_numericos(decodificado) if it[1] == it[1]]
+            for nombre, valor, unidad, ruta in validos:
+                db.add(ValorDato(
+                    dato_id=dato.id,
+                    nombre_variable=nombre,
+                    ruta_variable=ruta,
+                    unidad=unidad,
+                    valor=valor,
+                ))
+            acumular_resumen_horario(db, dato.dispositivo_id, dato.fecha_hora, validos)
+            dato.origen = "local"
+            dato.json_decodificado = decodificado
+            conteo["decodificados"] += 1
+            conteo["valores"] += len(validos)
+
+        db.commit()
+        logger.info(f"[UPLINKS] redecodificación: {conteo}")
+
+    return conteo
+
+
+if __name__ == "__main__":
+    # python -m services.uplinks redecodificar [eui]
+    import sys
+
+    from database import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    orden = sys.argv[1] if len(sys.argv) > 1 else ""
+    if orden != "redecodificar":
+        sys.exit(f"orden desconocida: {orden}")
+    with SessionLocal() as sesion:
+        print(redecodificar(sesion, sys.argv[2] if len(sys.argv) > 2 else None))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos del API se importan como en el contenedor (cwd = api/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
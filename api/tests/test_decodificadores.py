@@ -0,0 +1,31 @@
+import base64
+
+from services.decodificadores import buscar_decodificador, decodificar_frm_payload
+
+
+def _lpp(hex_payload):
+    dec = buscar_decodificador("cayenne", "lpp")
+    uplink = {"frm_payload": base64.b64encode(bytes.fromhex(hex_payload)).decode(), "f_port": 1}
+    return decodificar_frm_payload(dec, uplink)
+
+
+def test_lpp_gps_y_acelerometro():
+    # Ejemplos de la especificación Cayenne LPP
+    salida = _lpp("018806765ff2960a0003e8" "067104d2fb2e0000")
+
+    gps = salida["ch1"]["gps"]
+    assert gps["latitude"]["value"] == 42.3519
+    assert gps["longitude"]["value"] == -87.9094
+    assert gps["altitude"]["value"] == 10.0
+    assert salida["ch6"]["accelerometer"] == {
+        "x": {"value": 1.234, "unit": "G"},
+        "y": {"value": -1.234, "unit": "G"},
+        "z": {"value": 0.0, "unit": "G"},
+    }
+
+
+def test_lpp_tipo_desconocido_conserva_lo_decodificado():
+    # ch3 temperatura 27.2 C, luego un tipo inexistente (0xfe)
+    salida = _lpp("03670110" "05fe0102")
+
+    assert salida == {"ch3": {"temperature": {"value": 27.2, "unit": "C"}}}
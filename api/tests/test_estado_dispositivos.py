@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+
+import models  # noqa: F401  (configura los mappers)
+from models import EstadoDispositivo
+from services.estado_dispositivos import clasificar, registrar_uplink
+
+
+class _Consulta:
+    def __init__(self, estado):
+        self.estado = estado
+
+    def filter(self, *args):
+        return self
+
+    def with_for_update(self):
+        return self
+
+    def one(self):
+        return self.estado
+
+
+class SesionFalsa:
+    # Lo justo para registrar_uplink: el upsert inicial y el SELECT ... FOR UPDATE
+    def __init__(self):
+        self.estado = EstadoDispositivo(dispositivo_id=1)
+
+    def execute(self, *args, **kwargs):
+        pass
+
+    def query(self, modelo):
+        return _Consulta(self.estado)
+
+
+def _simular(deltas, con_f_cnt=False):
+    db = SesionFalsa()
+    t = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    f_cnt = 0
+    registrar_uplink(db, 1, t, f_cnt if con_f_cnt else None)
+    for delta in deltas:
+        t += timedelta(seconds=delta)
+        f_cnt += 1
+        registrar_uplink(db, 1, t, f_cnt if con_f_cnt else None)
+    return db.estado
+
+
+def test_perdidas_periodicas_no_inflan_el_intervalo():
+    # Periodo 600 s; cada tercer intervalo faltan 2 uplinks (40 perdidos reales)
+    estado = _simular([600, 600, 1800] * 20)
+
+    assert abs(estado.intervalo_esperado_s - 600) < 1
+    # El primer hueco cae mientras se aprende el intervalo y no se estima
+    assert estado.uplinks_perdidos == 38
+    assert clasificar(estado, estado.ultimo_visto)[0] == "degradado"
+
+
+def test_primer_delta_corto_no_deja_perdidas_fantasma():
+    # Primer delta de 1 s (retransmisión) y luego el periodo real de 600 s
+    estado = _simular([1] + [600] * 20)
+
+    assert abs(estado.intervalo_esperado_s - 600) < 1
+    assert estado.uplinks_perdidos == 0
+    assert clasificar(estado, estado.ultimo_visto)[0] == "ok"
+
+
+def test_cambio_de_periodo_con_f_cnt_se_reaprende():
+    estado = _simular([300] * 10 + [1800] * 5, con_f_cnt=True)
+
+    assert abs(estado.intervalo_esperado_s - 1800) < 1
+    assert estado.uplinks_perdidos == 0
@@ -0,0 +1,78 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from core import deps, limites
+from core.cache import CacheTTL
+from core.limites import LimitadorTasa, limitar_por_token
+
+
+class _Consulta:
+    def __init__(self, usuarios):
+        self.usuarios = usuarios
+        self.token = None
+
+    def filter(self, condicion):
+        self.token = condicion.right.value
+        return self
+
+    def first(self):
+        return self.usuarios.get(self.token)
+
+
+class SesionFalsa:
+    def __init__(self, usuarios):
+        self.usuarios = usuarios
+        self.consultas = 0
+
+    def query(self, modelo):
+        self.consultas += 1
+        return _Consulta(self.usuarios)
+
+
+def _request(ip):
+    return SimpleNamespace(client=SimpleNamespace(host=ip))
+
+
+@pytest.fixture(autouse=True)
+def limites_limpios(monkeypatch):
+    monkeypatch.setattr(limites, "LIMITES_ACTIVOS", True)
+    monkeypatch.setattr(limites, "limitador_token", LimitadorTasa(5, 20, 1000))
+    monkeypatch.setattr(limites, "limitador_desconocido", LimitadorTasa(20, 40, 1000))
+    monkeypatch.setattr(deps, "_cache_usuarios", CacheTTL(1000, 60))
+    monkeypatch.setattr(deps, "_cache_tokens_invalidos", CacheTTL(1000, 30))
+
+
+def test_flood_de_tokens_falsos_no_bloquea_a_usuarios_reales():
+    # Token real fuera de la caché (caducó o el usuario se registró después del calentamiento)
+    usuario = SimpleNamespace(id=7, nombre="Ana", correo="ana@demo.com", rol="usuario")
+    db = SesionFalsa({"token-real": usuario})
+
+    rechazados = 0
+    for _ in range(60):
+        try:
+            limitar_por_token(_request("203.0.113.9"), db, uuid.uuid4().hex)
+        except HTTPException as e:
+            assert e.status_code == 429
+            rechazados += 1
+    assert rechazados > 0
+    # Los rechazados por tasa no llegan a la DB
+    assert db.consultas == 60 - rechazados
+
+    limitar_por_token(_request("198.51.100.4"), db, "token-real")
+    assert deps.token_en_cache("token-real") is True
+
+
+def test_usuario_autenticado_se_limita_por_id():
+    usuario = SimpleNamespace(id=7, nombre="Ana", correo="ana@demo.com", rol="usuario")
+    db = SesionFalsa({"token-real": usuario})
+
+    for _ in range(20):
+        limitar_por_token(_request("198.51.100.4"), db, "token-real")
+    with pytest.raises(HTTPException) as e:
+        limitar_por_token(_request("198.51.100.4"), db, "token-real")
+    assert e.value.status_code == 429
+    # Solo la primera petición consultó la DB
+    assert db.consultas == 1